@@ -1,6 +1,19 @@
 # backend/__init__.py
-from .stt import transcribe_audio
-from .translation import translate_text
-from .tts import text_to_speech
+import importlib
 
-__all__ = ["transcribe_audio", "translate_text", "text_to_speech"]
\ No newline at end of file
+# Submodules are imported on first access, so entry points such as
+# backend.serve can set the environment before the cache and model
+# modules read it at import time
+_EXPORTS = {
+    "transcribe_audio": "stt",
+    "translate_text": "translation",
+    "text_to_speech": "tts",
+}
+
+__all__ = ["transcribe_audio", "translate_text", "text_to_speech"]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,7 @@
 import os
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
+import json
+import time
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
@@ -9,25 +11,47 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import secrets
 import bleach
+from urllib.parse import quote
 from pathlib import Path
 from gtts import gTTS
-from fastapi.responses import JSONResponse, FileResponse
-from backend.translation import translate_text, SUPPORTED_LANGUAGES
-from backend.stt import transcribe_audio  # Correct import
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
+from backend.translation import (
+    stream_translation, translation_cache, approve_translation,
+    batching_stats, prefix_cache_stats, streaming_stats, speculative_stats, SUPPORTED_LANGUAGES
+)
+from backend.stt import transcribe_audio, translate_result, iter_transcript_segments, cached_segments, stt_cache, SilentAudioError  # Correct import
 from pydantic import BaseModel, validator
 import logging
 from pydub import AudioSegment
 import base64
-from typing import Literal
+from typing import Any, Dict, List, Literal
 from googletrans import Translator
-from backend.tts import text_to_speech
+from backend.tts import text_to_speech, translate_for_speech, audio_cache, find_cached_audio, audio_media_type
+from backend.tts_engines import engine_stats
+from backend.translation_engine import translate, translation_engine
+from backend.executor import get_pool, pool_stats, QueueFullError
+from backend.uploads import read_upload, UploadSizeLimitMiddleware
+from backend.streaming_stt import StreamingTranscriber
+from backend.jobs import job_manager
+from backend.registry import registry, WARMUP_MODELS
+from backend.translation_memory import translation_memory
+from backend.metrics import metrics, stage, MetricsMiddleware
+from backend.pipeline import speech_to_speech
+from backend.bulk import translate_bulk, parse_ndjson_segments
+from backend.rate_limit import RATE_LIMIT_STORAGE_URI
 
 # Security configurations
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB limit
+MAX_JOB_FILES = 500  # recordings per batch transcription job
+MAX_JOB_UPLOAD_SIZE = 200 * 1024 * 1024  # all recordings of one job together
+MAX_BULK_SEGMENTS = 5000  # segments per bulk translation request
 SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_urlsafe(32))
+# Bearer token required to add approved translations with POST /tm. Entries are
+# served to every user instead of the model, so the endpoint is off while unset.
+TM_ADMIN_TOKEN = os.getenv("TM_ADMIN_TOKEN", "")
 
-# Configure rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Configure rate limiter (RATE_LIMIT_STORAGE_URI shares the counters between workers)
+limiter = Limiter(key_func=get_remote_address, storage_uri=RATE_LIMIT_STORAGE_URI)
 
 # Configure secure file handling
 TEMP_DIR = Path("temp")
@@ -103,14 +127,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Transcript", "X-Audio-Id", "X-Translation-Backend", "X-Translation-Fallback", "Content-Range", "Accept-Ranges"],
 )
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["localhost", "127.0.0.1"])
+app.add_middleware(UploadSizeLimitMiddleware, max_body_size=MAX_FILE_SIZE, paths=["/stt", "/stt/segments", "/pipeline", "/translate/bulk"])
+app.add_middleware(UploadSizeLimitMiddleware, max_body_size=MAX_JOB_UPLOAD_SIZE, paths=["/jobs/transcriptions"])
+# Outermost, so request timings include every other middleware
+app.add_middleware(MetricsMiddleware)
 
 # Add rate limiting
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+async def _queue_full_handler(request: Request, exc: QueueFullError):
+    """Fast-fail overloaded stages with 503 and a Retry-After hint."""
+    logger.warning(f"Rejected request to {request.url.path}: {exc}")
+    return JSONResponse(
+        {"error": str(exc), "stage": exc.stage},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+app.add_exception_handler(QueueFullError, _queue_full_handler)
+
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
     response = await call_next(request)
@@ -125,9 +165,21 @@ class TranslateRequest(BaseModel):
     source_language: str
     target_language: str
 
+class BulkTranslateRequest(BaseModel):
+    segments: List[str]
+    source_language: str
+    target_language: str
+
+class ApprovedTranslation(BaseModel):
+    source_text: str
+    translated_text: str
+    source_language: str
+    target_language: str
+
 class TTSRequest(BaseModel):
     text: str
     target_language: str
+    source_language: str = "auto"
 
     @validator('text')
     def sanitize_text(cls, v):
@@ -139,10 +191,124 @@ class TTSRequest(BaseModel):
             raise ValueError(f"Unsupported language '{v}'. Supported languages: {', '.join(LANGUAGE_VOICE_MAP.keys())}")
         return v
 
+@app.on_event("startup")
+async def warm_up_models():
+    """Load models in the background so the server accepts requests right away."""
+    registry.warm_up(WARMUP_MODELS)
+
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the Healthcare Translation Web App!"}
 
+@app.get("/health/live")
+async def liveness_probe():
+    """The process is up and serving requests."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_probe():
+    """
+    Ready once every warm-up model is loaded.
+    Reports the state and load time of every registered model.
+    """
+    ready = registry.ready(WARMUP_MODELS)
+    return JSONResponse(
+        {"status": "ready" if ready else "loading", "models": registry.status()},
+        status_code=200 if ready else 503
+    )
+
+@app.get("/stats")
+async def stats_endpoint():
+    """
+    Runtime statistics for capacity planning.
+    Reports queue depth and wait times for each inference stage
+    and how well translation requests are being deduplicated and cached.
+    Counters are per process; with several workers each request reports
+    the worker (`worker_pid`) that answered it.
+    """
+    return {
+        "worker_pid": os.getpid(),
+        "queues": pool_stats(),
+        "batching": batching_stats(),
+        "translation_cache": translation_cache.stats(),
+        "stt_cache": stt_cache.stats(),
+        "prompt_prefix_cache": prefix_cache_stats(),
+        "streaming": streaming_stats(),
+        "speculative_decoding": speculative_stats(),
+        "tts_cache": audio_cache.stats(),
+        "tts_engines": engine_stats(),
+        "translation_backends": translation_engine.stats(),
+        "translation_memory": translation_memory.stats()
+    }
+
+def _cache_counters() -> dict:
+    """Hit and miss counters of every cache, keyed by cache name."""
+    tm = translation_memory.stats()["pairs"].values()
+    tm_hits = sum(p["exact_hits"] + p["patched_hits"] + p["fuzzy_hits"] for p in tm)
+    counters = {
+        "translation_memory": (tm_hits, sum(p["lookups"] for p in tm) - tm_hits),
+        "tts_audio": (audio_cache.hits, audio_cache.misses),
+    }
+    for name, cache in (("translation", translation_cache), ("stt", stt_cache)):
+        tiers = cache.stats()
+        counters[name] = (tiers["memory"]["hits"], tiers["memory"]["misses"])
+        if tiers["disk"] is not None:
+            counters[f"{name}_disk"] = (tiers["disk"]["hits"], tiers["disk"]["misses"])
+    prefix = prefix_cache_stats()
+    if "hits" in prefix:
+        counters["prompt_prefix"] = (prefix["hits"], prefix["misses"])
+    return counters
+
+def _speculative_counters() -> dict:
+    """Draft tokens proposed and accepted, when speculative decoding is enabled and loaded."""
+    stats = speculative_stats()
+    if "proposed_tokens" not in stats:
+        return {}
+    return {("proposed",): stats["proposed_tokens"], ("accepted",): stats["accepted_tokens"]}
+
+metrics.callback(
+    "cache_hits_total", "counter", "Cache hits by cache.", ["cache"],
+    lambda: {(name,): hits for name, (hits, _) in _cache_counters().items()}
+)
+metrics.callback(
+    "cache_misses_total", "counter", "Cache misses by cache.", ["cache"],
+    lambda: {(name,): misses for name, (_, misses) in _cache_counters().items()}
+)
+metrics.callback(
+    "queue_depth", "gauge", "Calls waiting for a worker in each inference pool.", ["pool"],
+    lambda: {(name,): s["queue_depth"] for name, s in pool_stats().items()}
+)
+metrics.callback(
+    "queue_running", "gauge", "Calls running in each inference pool.", ["pool"],
+    lambda: {(name,): s["running"] for name, s in pool_stats().items()}
+)
+metrics.callback(
+    "queue_rejected_total", "counter", "Calls rejected because a pool queue was full.", ["pool"],
+    lambda: {(name,): s["rejected"] for name, s in pool_stats().items()}
+)
+metrics.callback(
+    "translation_backend_calls_total", "counter", "Calls to each translation backend.", ["backend"],
+    lambda: {(name,): s["calls"] for name, s in translation_engine.stats().items()}
+)
+metrics.callback(
+    "translation_backend_errors_total", "counter", "Failed calls to each translation backend.", ["backend"],
+    lambda: {(name,): s["errors"] for name, s in translation_engine.stats().items()}
+)
+metrics.callback(
+    "speculative_draft_tokens_total", "counter",
+    "Tokens proposed by the speculative draft model and accepted by the translation model.", ["result"],
+    _speculative_counters
+)
+metrics.callback(
+    "model_ready", "gauge", "Whether each model is loaded (1) or not (0).", ["model"],
+    lambda: {(name,): int(s["state"] == "ready") for name, s in registry.status().items()}
+)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage timings, model throughput, queue waits and cache hits."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/translate")
 async def translate_endpoint(request: TranslateRequest):
     """
@@ -151,15 +317,124 @@ async def translate_endpoint(request: TranslateRequest):
     Returns the translated text.
     """
     try:
-        result = translate_text(
+        result = await get_pool("llm").run(
+            translate,
             text=request.text,
             source_lang=request.source_language,
             target_lang=request.target_language
         )
-        return JSONResponse(result)
+        with stage("encode"):
+            return JSONResponse(result)
+    except QueueFullError:
+        raise
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
+@app.post("/translate/stream")
+async def translate_stream_endpoint(request: TranslateRequest):
+    """
+    Streaming text translation over Server-Sent Events.
+    Emits a `token` event for every generated piece of text and a final
+    `final` event with the cleaned translation and time-to-first-token.
+    """
+    frames = get_pool("llm").stream(
+        stream_translation,
+        text=request.text,
+        source_lang=request.source_language,
+        target_lang=request.target_language,
+        requested_at=time.perf_counter(),
+        cancellable=True
+    )
+
+    async def event_stream():
+        try:
+            async for frame in frames:
+                yield f"event: {frame['type']}\ndata: {json.dumps(frame)}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming translation failed: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            # Runs on disconnect too: stops the model after the current token
+            await frames.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/translate/bulk")
+@limiter.limit("10/minute")
+async def translate_bulk_endpoint(request: Request, source_language: str = "en", target_language: str = "es"):
+    """
+    Translate many segments in one request.
+    Takes a JSON body ({"segments": [...], "source_language", "target_language"})
+    or newline-delimited JSON (one string or {"text": ...} per line, languages
+    as query parameters). Identical segments are translated once. Streams
+    newline-delimited JSON with one `segment` (or `error`) event per input
+    segment in input order, then a `done` event with throughput.
+    """
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            segments = parse_ndjson_segments(body)
+        else:
+            bulk = BulkTranslateRequest(**json.loads(body))
+            segments = bulk.segments
+            source_language, target_language = bulk.source_language, bulk.target_language
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk translation request: {str(e)}")
+    if len(segments) > MAX_BULK_SEGMENTS:
+        raise HTTPException(status_code=413, detail=f"Too many segments. Maximum is {MAX_BULK_SEGMENTS} per request.")
+
+    events = translate_bulk(segments, source_language, target_language)
+
+    async def event_stream():
+        try:
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"Bulk translation failed: {str(e)}")
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def require_tm_admin(request: Request) -> None:
+    """Allow only callers presenting TM_ADMIN_TOKEN as a bearer token."""
+    if not TM_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Translation memory updates are disabled")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), TM_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin token")
+
+@app.post("/tm")
+@limiter.limit("30/minute")
+async def translation_memory_endpoint(request: Request, approved: ApprovedTranslation):
+    """
+    Add a reviewed sentence pair to the translation memory.
+    Later requests for the same or a near-identical sentence skip the model.
+    Needs `Authorization: Bearer <TM_ADMIN_TOKEN>`.
+    """
+    require_tm_admin(request)
+    for language in (approved.source_language, approved.target_language):
+        if language not in SUPPORTED_LANGUAGES:
+            raise HTTPException(status_code=400, detail=f"Language '{language}' not supported")
+    if approved.source_language == approved.target_language:
+        raise HTTPException(status_code=400, detail="Source and target language must differ")
+    if not approved.source_text.strip() or not approved.translated_text.strip():
+        raise HTTPException(status_code=400, detail="Source and translated text are required")
+    approve_translation(
+        approved.source_text.strip(),
+        approved.translated_text.strip(),
+        approved.source_language,
+        approved.target_language
+    )
+    return {"status": "stored", "entries": translation_memory.stats()["entries"]}
+
 @app.post("/stt")
 @limiter.limit("10/minute")
 async def stt_endpoint(
@@ -169,28 +444,34 @@ async def stt_endpoint(
     output_language: str = Form("en")
 ):
     try:
-        # Read the file content
-        content = await audio_file.read()
-        
-        # Validate file size
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail="File too large. Maximum size is 10MB."
-            )
+        # Read the file content, enforcing the size limit while reading
+        content = await read_upload(audio_file, MAX_FILE_SIZE)
 
         # Process the audio using the transcribe_audio function
-        transcription_result = transcribe_audio(
+        transcription_result = await get_pool("whisper").run(
+            transcribe_audio,
             audio_bytes=content,
-            input_language=input_language,
-            output_language=output_language
+            input_language=input_language
         )
+        # Translate on the LLM pool so the Whisper worker is free for the next recording
+        if output_language != input_language:
+            transcription_result = await get_pool("llm").run(
+                translate_result, transcription_result, input_language, output_language
+            )
 
-        return JSONResponse({
-            "success": True,
-            **transcription_result
-        })
+        with stage("encode"):
+            return JSONResponse({
+                "success": True,
+                **transcription_result
+            })
 
+    except (QueueFullError, HTTPException):
+        raise
+    except SilentAudioError as e:
+        return JSONResponse(
+            {"success": False, "error": str(e), "reason": e.reason},
+            status_code=422
+        )
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return JSONResponse(
@@ -202,6 +483,172 @@ async def stt_endpoint(
             status_code=500
         )
 
+@app.post("/stt/segments")
+@limiter.limit("10/minute")
+async def stt_segments_endpoint(
+    request: Request,
+    audio_file: UploadFile = File(...),
+    input_language: str = Form("en")
+):
+    """
+    Transcription streamed as newline-delimited JSON, one `segment` event per
+    transcript segment as soon as Whisper produces it, then a `done` event.
+    Suited to long recordings, which are transcribed in batches.
+    Shares the transcript cache with /stt: a cached recording is replayed at once.
+    """
+    content = await read_upload(audio_file, MAX_FILE_SIZE)
+    cached = cached_segments(content, input_language)
+    if cached is None:
+        segments = get_pool("whisper").stream(iter_transcript_segments, content, input_language)
+
+    async def event_stream():
+        count = 0
+        try:
+            if cached is not None:
+                for segment in cached:
+                    yield json.dumps({"type": "segment", "index": count, **segment}) + "\n"
+                    count += 1
+            else:
+                async for segment in segments:
+                    yield json.dumps({"type": "segment", "index": count, **segment}) + "\n"
+                    count += 1
+            yield json.dumps({"type": "done", "segments": count, "cached": cached is not None}) + "\n"
+        except Exception as e:
+            logger.error(f"Segment transcription failed: {str(e)}")
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        finally:
+            if cached is None:
+                await segments.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/pipeline")
+@limiter.limit("10/minute")
+async def pipeline_endpoint(
+    request: Request,
+    audio_file: UploadFile = File(...),
+    input_language: str = Form("en"),
+    output_language: str = Form("en")
+):
+    """
+    Speech-to-speech in one request: transcribe, translate and synthesize.
+    Streams newline-delimited JSON with one `segment` event per transcript
+    segment (original and translated text plus an `audio_url`) as soon as it
+    is ready, followed by a `done` event.
+    """
+    if output_language not in LANGUAGE_VOICE_MAP:
+        raise HTTPException(status_code=400, detail=f"Unsupported output language '{output_language}'")
+    content = await read_upload(audio_file, MAX_FILE_SIZE)
+    events = speech_to_speech(content, input_language, output_language)
+
+    async def event_stream():
+        try:
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"Speech-to-speech pipeline failed: {str(e)}")
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/stt")
+async def stt_stream_endpoint(websocket: WebSocket, input_language: str = "en", output_language: str = "en"):
+    """
+    Live speech-to-text over a WebSocket.
+    The client sends binary frames of 16 kHz mono 16-bit little-endian PCM
+    and a {"type": "stop"} text frame when done. The server answers with
+    `partial` and `final` transcript events as utterances are detected.
+    """
+    await websocket.accept()
+    session = StreamingTranscriber(input_language, output_language)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                events = await session.feed(message["bytes"])
+            elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                for event in await session.finish():
+                    await websocket.send_json(event)
+                await websocket.close()
+                break
+            else:
+                continue
+            for event in events:
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Live transcription failed: {str(e)}")
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close(code=1011)
+
+@app.post("/jobs/transcriptions")
+@limiter.limit("5/minute")
+async def create_transcription_job(
+    request: Request,
+    audio_files: List[UploadFile] = File(...),
+    input_language: str = Form("auto")
+):
+    """
+    Submit a batch of recordings for transcription.
+    Returns a job id to poll with GET /jobs/{job_id}.
+    """
+    if len(audio_files) > MAX_JOB_FILES:
+        raise HTTPException(status_code=413, detail=f"Too many files. Maximum is {MAX_JOB_FILES} per job.")
+
+    files = [(audio_file.filename, await read_upload(audio_file, MAX_FILE_SIZE)) for audio_file in audio_files]
+    job = job_manager.submit(files, language=None if input_language == "auto" else input_language)
+    return JSONResponse(job.status(), status_code=202)
+
+@app.get("/jobs/{job_id}")
+async def get_transcription_job(job_id: str):
+    """Progress and throughput of a batch transcription job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.status()
+
+@app.get("/jobs/{job_id}/results")
+async def get_transcription_job_results(job_id: str):
+    """Per-file transcripts of a batch transcription job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {**job.status(), "results": job.results()}
+
+async def synthesize_with_translation(text: str, target_language: str, source_language: str) -> Dict[str, Any]:
+    """
+    Translate on the LLM pool (skipped when the text is already in the target
+    language), then synthesize on the TTS pool, so each stage keeps its own
+    admission limits and a TTS worker never waits on the model.
+    The audio file comes back pinned in the cache; release it with audio_cache.unpin.
+    """
+    translation = None
+    if source_language != target_language:
+        translation = await get_pool("llm").run(translate_for_speech, text, source_language, target_language)
+    return await get_pool("tts").run(
+        text_to_speech, text, None, target_language, source_language, translation, pin=True
+    )
+
+class CachedAudioResponse(FileResponse):
+    """FileResponse for a pinned audio cache file; the pin is released once the response is over."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            audio_cache.unpin(self.path)
+
 @app.post("/tts")
 async def tts_endpoint(request: Request):
     """
@@ -211,22 +658,30 @@ async def tts_endpoint(request: Request):
         data = await request.json()
         text = data.get("text")
         target_language = data.get("target_language")
+        source_language = data.get("source_language") or "auto"
 
         if not text or not target_language:
             raise ValueError("Both 'text' and 'target_language' are required.")
 
-        # Generate the speech and get the response
-        output_path = "temp/output.wav"
-        tts_response = text_to_speech(text, output_path, target_language)
+        # Generate the speech (or reuse cached audio) and get the response
+        tts_response = await synthesize_with_translation(text, target_language, source_language)
 
         # Read the audio file and encode it as base64
-        with open(tts_response["audio_file"], "rb") as audio_file:
-            audio_base64 = base64.b64encode(audio_file.read()).decode("utf-8")
+        try:
+            with stage("encode"), open(tts_response["audio_file"], "rb") as audio_file:
+                audio_base64 = base64.b64encode(audio_file.read()).decode("utf-8")
+        finally:
+            audio_cache.unpin(tts_response["audio_file"])
 
         return {
             "audio_file": audio_base64,
-            "transcribed_text": tts_response["transcribed_text"]
+            "audio_url": f"/tts/audio/{tts_response['audio_id']}",
+            "transcribed_text": tts_response["transcribed_text"],
+            "translation_backend": tts_response["translation_backend"],
+            "translation_fallback": tts_response["translation_fallback"]
         }
+    except QueueFullError:
+        raise
     except Exception as e:
         logger.error(f"TTS endpoint failed: {str(e)}")
         return JSONResponse(
@@ -234,6 +689,61 @@ async def tts_endpoint(request: Request):
             content={"error": str(e)}
         )
 
+@app.post("/tts/audio")
+async def tts_audio_endpoint(request: Request):
+    """
+    Text-to-Speech endpoint returning the audio bytes directly.
+    The translated transcript is sent URL-encoded in the X-Transcript header
+    and the audio can be fetched again from the Content-Location URL.
+    """
+    try:
+        data = await request.json()
+        text = data.get("text")
+        target_language = data.get("target_language")
+        source_language = data.get("source_language") or "auto"
+
+        if not text or not target_language:
+            raise ValueError("Both 'text' and 'target_language' are required.")
+
+        tts_response = await synthesize_with_translation(text, target_language, source_language)
+    except QueueFullError:
+        raise
+    except Exception as e:
+        logger.error(f"TTS audio endpoint failed: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e)}
+        )
+
+    audio_path = tts_response["audio_file"]
+    return CachedAudioResponse(
+        audio_path,
+        media_type=audio_media_type(audio_path),
+        headers={
+            "X-Transcript": quote(tts_response["transcribed_text"]),
+            "X-Audio-Id": tts_response["audio_id"],
+            "X-Translation-Backend": tts_response["translation_backend"] or "",
+            "X-Translation-Fallback": "1" if tts_response["translation_fallback"] else "0",
+            "Content-Location": f"/tts/audio/{tts_response['audio_id']}",
+            "Cache-Control": "private, max-age=86400"
+        }
+    )
+
+@app.get("/tts/audio/{audio_id}")
+async def tts_cached_audio_endpoint(audio_id: str):
+    """
+    Serve previously synthesized audio.
+    Supports HTTP Range requests so playback can start before the whole file arrives.
+    """
+    audio_path = find_cached_audio(audio_id, pin=True)
+    if audio_path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return CachedAudioResponse(
+        audio_path,
+        media_type=audio_media_type(audio_path),
+        headers={"Cache-Control": "private, max-age=86400"}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,210 @@
+# backend/batched_decoding.py
+import time
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Sequence:
+    """One prompt being generated inside a BatchedDecoder."""
+
+    def __init__(self, tokens: List[int], max_tokens: int, stop: bytes, payload: Any = None):
+        self.tokens = tokens
+        self.max_tokens = max_tokens
+        self.stop = stop
+        self.payload = payload
+        self.slot = -1
+        self.position = 0
+        self.logits_index = -1
+        self.next_token: Optional[int] = None
+        self.generated: List[int] = []
+        self.text = b""
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def output(self) -> str:
+        """Generated text up to the stop sequence."""
+        text = self.text
+        if self.stop and self.stop in text:
+            text = text[:text.index(self.stop)]
+        return text.decode("utf-8", errors="ignore")
+
+
+def sample_token(logits: np.ndarray, temperature: float, top_k: int, top_p: float, min_p: float,
+                 rng: np.random.Generator) -> int:
+    """
+    Sample from logits with the same filters, in the same order, as llama.cpp's
+    default sampler chain: top-k, top-p, min-p, then temperature.
+    """
+    if temperature <= 0:
+        return int(np.argmax(logits))
+    k = min(top_k, len(logits)) if top_k > 0 else len(logits)
+    candidates = np.argpartition(logits, -k)[-k:]
+    candidates = candidates[np.argsort(-logits[candidates])]
+    scores = logits[candidates].astype(np.float64)
+    probs = np.exp(scores - scores[0])
+    probs /= probs.sum()
+    keep = int(np.searchsorted(np.cumsum(probs), top_p)) + 1
+    keep = max(1, min(keep, len(candidates), int(np.sum(probs >= min_p * probs[0]))))
+    candidates, scores = candidates[:keep], scores[:keep]
+    weights = np.exp((scores - scores[0]) / temperature)
+    return int(rng.choice(candidates, p=weights / weights.sum()))
+
+
+class BatchedDecoder:
+    """
+    Decodes several prompts together in one llama context.
+
+    Every prompt runs as its own sequence id in a shared KV cache. One call to
+    `step` evaluates, in a single llama_decode batch, the prompts of newly
+    admitted sequences together with the next token of every running one, so
+    the weights are read once per step for all of them. Sequences join and
+    leave between steps (continuous batching).
+
+    The context is created over the weights of an already loaded Llama, so
+    it only adds its own KV cache: `context_per_sequence` tokens per sequence.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        max_sequences: int,
+        context_per_sequence: int,
+        n_threads: int,
+        temperature: float = 0.3,
+        top_k: int = 40,
+        top_p: float = 0.95,
+        min_p: float = 0.05,
+        seed: Optional[int] = None
+    ):
+        import llama_cpp
+        from llama_cpp import _internals
+
+        self.llm = llm
+        self.max_sequences = max(1, max_sequences)
+        self.context_per_sequence = context_per_sequence
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+        self.min_p = min_p
+        self._rng = np.random.default_rng(seed)
+        self._llama_cpp = llama_cpp
+
+        params = llama_cpp.llama_context_default_params()
+        params.n_ctx = context_per_sequence * self.max_sequences
+        # A step holds at most every prompt at once
+        params.n_batch = params.n_ctx
+        params.n_ubatch = min(512, params.n_ctx)
+        params.n_seq_max = self.max_sequences
+        params.n_threads = n_threads
+        params.n_threads_batch = n_threads
+        self.ctx = _internals.LlamaContext(model=llm._model, params=params, verbose=False)
+        self.batch = _internals.LlamaBatch(n_tokens=params.n_batch, embd=0, n_seq_max=1, verbose=False)
+        self.n_vocab = llm.n_vocab()
+        self.eos = llm.token_eos()
+
+        self.running: Dict[int, Sequence] = {}
+        self._free = list(range(self.max_sequences - 1, -1, -1))
+        self.steps = 0
+        self.step_sequences = 0
+        self.max_sequences_seen = 0
+
+    def free_slots(self) -> int:
+        return len(self._free)
+
+    def _add(self, token: int, position: int, slot: int, logits: bool) -> int:
+        batch = self.batch.batch
+        index = batch.n_tokens
+        batch.token[index] = token
+        batch.pos[index] = position
+        batch.seq_id[index][0] = slot
+        batch.n_seq_id[index] = 1
+        batch.logits[index] = logits
+        batch.n_tokens = index + 1
+        return index
+
+    def _logits(self, index: int) -> np.ndarray:
+        pointer = self._llama_cpp.llama_get_logits_ith(self.ctx.ctx, index)
+        return np.ctypeslib.as_array(pointer, shape=(self.n_vocab,))
+
+    def _release(self, sequence: Sequence) -> None:
+        del self.running[sequence.slot]
+        self.ctx.kv_cache_seq_rm(sequence.slot, -1, -1)
+        self._free.append(sequence.slot)
+        sequence.finished = time.perf_counter()
+
+    def step(self, new: List[Sequence]) -> List[Sequence]:
+        """
+        Admit new sequences and advance every running sequence by one token.
+
+        Returns:
+            List[Sequence]: the sequences that finished in this step
+        """
+        if len(new) > len(self._free):
+            raise ValueError(f"Only {len(self._free)} free sequence slots for {len(new)} new sequences")
+        for sequence in new:
+            if not sequence.tokens or len(sequence.tokens) >= self.context_per_sequence:
+                raise ValueError(f"Prompt of {len(sequence.tokens)} tokens does not fit the sequence context")
+        self.batch.reset()
+        for sequence in self.running.values():
+            sequence.logits_index = self._add(sequence.next_token, sequence.position, sequence.slot, True)
+            sequence.position += 1
+        for sequence in new:
+            sequence.slot = self._free.pop()
+            self.ctx.kv_cache_seq_rm(sequence.slot, -1, -1)
+            last = len(sequence.tokens) - 1
+            for position, token in enumerate(sequence.tokens):
+                index = self._add(token, position, sequence.slot, position == last)
+            sequence.logits_index = index
+            sequence.position = len(sequence.tokens)
+            self.running[sequence.slot] = sequence
+
+        if self.batch.batch.n_tokens == 0:
+            return []
+        # On failure the running sequences are left for abort()
+        self.ctx.decode(self.batch)
+        self.steps += 1
+        self.step_sequences += len(self.running)
+        self.max_sequences_seen = max(self.max_sequences_seen, len(self.running))
+
+        finished = []
+        for sequence in list(self.running.values()):
+            token = sample_token(
+                self._logits(sequence.logits_index),
+                self.temperature, self.top_k, self.top_p, self.min_p, self._rng
+            )
+            done = token == self.eos
+            if not done:
+                sequence.generated.append(token)
+                sequence.text += self.llm.detokenize([token])
+                done = (
+                    len(sequence.generated) >= sequence.max_tokens
+                    or sequence.position >= self.context_per_sequence
+                    or bool(sequence.stop) and sequence.stop in sequence.text
+                )
+            if done:
+                self._release(sequence)
+                finished.append(sequence)
+            else:
+                sequence.next_token = token
+        return finished
+
+    def abort(self) -> List[Sequence]:
+        """Drop every running sequence, e.g. after a failed step, and return them."""
+        aborted = list(self.running.values())
+        for sequence in aborted:
+            self._release(sequence)
+        return aborted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_sequences": self.max_sequences,
+            "running": len(self.running),
+            "steps": self.steps,
+            "avg_sequences_per_step": round(self.step_sequences / self.steps, 2) if self.steps else 0.0,
+            "max_sequences_seen": self.max_sequences_seen,
+        }
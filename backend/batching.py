@@ -0,0 +1,224 @@
+# backend/batching.py
+import os
+import time
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BatchKey = Tuple[str, str, str]  # (text, source_lang, target_lang)
+
+
+class TranslationScheduler:
+    """
+    Request coalescing and batched decoding in front of a set of translators.
+
+    With `max_batch_size` > 1 every translator gets a BatchedDecoder and a
+    thread that decodes up to `max_batch_size` requests together as sequences
+    of one llama context. An idle decoder waits up to `max_wait` seconds for
+    a batch to fill; a busy one admits queued requests into free slots between
+    steps, so a request never waits for a whole batch to finish.
+
+    With `max_batch_size` 1 each translator context decodes one sequence at a
+    time on its own thread, and further requests wait for a free context.
+
+    A request identical to one that is queued or still decoding joins it
+    instead of being decoded again. Each caller receives its own Future.
+    `checkout` lends a translator's own context, which batched decoding does
+    not use, e.g. for streaming.
+    """
+
+    def __init__(self, translators: Sequence[Any], max_batch_size: int = 1, max_wait: float = 0.0):
+        if not translators:
+            raise ValueError("At least one translator context is required")
+        self.translators = list(translators)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self.decoders: List[Any] = []
+        if self.max_batch_size > 1:
+            try:
+                self.decoders = [t.create_batched_decoder(self.max_batch_size) for t in self.translators]
+            except Exception as e:
+                logger.error(f"Batched decoding unavailable, decoding one request per context: {str(e)}")
+                self.decoders = []
+        self._submitted = 0
+        self._decoded = 0
+        self._deduplicated = 0
+        self._start()
+        if hasattr(os, "register_at_fork"):
+            # Threads do not survive fork(); workers of the pre-fork server restart them
+            os.register_at_fork(after_in_child=self._start)
+
+    def _start(self) -> None:
+        self._idle: "queue.Queue[Any]" = queue.Queue()
+        for translator in self.translators:
+            self._idle.put(translator)
+        self._lock = threading.Lock()
+        # Futures waiting for each queued or decoding request
+        self._inflight: Dict[BatchKey, List[Future]] = {}
+        self._pending = 0
+        if self.decoders:
+            self._queue: "queue.Queue[BatchKey]" = queue.Queue()
+            for translator, decoder in zip(self.translators, self.decoders):
+                threading.Thread(
+                    target=self._run_batches, args=(translator, decoder),
+                    name="llama-batch", daemon=True
+                ).start()
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self.translators),
+                thread_name_prefix="llama-context"
+            )
+
+    def submit(self, text: str, source_lang: str, target_lang: str) -> Future:
+        """Queue a translation and return a Future resolving to the translator's result dict."""
+        key = (text, source_lang, target_lang)
+        future: Future = Future()
+        with self._lock:
+            self._submitted += 1
+            waiting = self._inflight.get(key)
+            if waiting is not None:
+                waiting.append(future)
+                self._deduplicated += 1
+                return future
+            self._inflight[key] = [future]
+            self._pending += 1
+        if self.decoders:
+            self._queue.put(key)
+        else:
+            self._executor.submit(self._decode, key)
+        return future
+
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        """Borrow an idle translator context for exclusive use."""
+        translator = self._idle.get()
+        try:
+            yield translator
+        finally:
+            self._idle.put(translator)
+
+    def _finish(self, key: BatchKey) -> List[Future]:
+        """Stop accepting duplicates of a request and return the futures still waiting for it."""
+        with self._lock:
+            futures = self._inflight.pop(key)
+        return [future for future in futures if future.set_running_or_notify_cancel()]
+
+    def _take(self, key: BatchKey) -> bool:
+        """Dequeue a request; False if every caller has cancelled it."""
+        with self._lock:
+            self._pending -= 1
+            if all(future.cancelled() for future in self._inflight[key]):
+                del self._inflight[key]
+                return False
+            self._decoded += 1
+            return True
+
+    def _resolve(self, key: BatchKey, result: Optional[Dict[str, Any]] = None,
+                 error: Optional[Exception] = None) -> None:
+        for future in self._finish(key):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(dict(result))
+
+    def _next_batch(self, decoder: Any) -> List[BatchKey]:
+        """Requests to admit into the decoder's free slots before its next step."""
+        keys: List[BatchKey] = []
+        if not decoder.running:
+            # Nothing to advance: wait for work, then briefly for a batch to fill
+            keys.append(self._queue.get())
+            deadline = time.monotonic() + self.max_wait
+            while len(keys) < decoder.free_slots():
+                remaining = deadline - time.monotonic()
+                try:
+                    keys.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            return keys
+        while len(keys) < decoder.free_slots():
+            try:
+                keys.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return keys
+
+    def _run_batches(self, translator: Any, decoder: Any) -> None:
+        """Continuous batching loop of one decoder."""
+        while True:
+            new = []
+            for key in self._next_batch(decoder):
+                if not self._take(key):
+                    continue
+                text, source_lang, target_lang = key
+                try:
+                    if source_lang == target_lang:
+                        # Nothing to decode
+                        self._resolve(key, translator.translate_text(text, source_lang, target_lang))
+                    else:
+                        new.append(translator.prepare_sequence(text, source_lang, target_lang, payload=key))
+                except Exception as e:
+                    logger.error(f"Translation error: {str(e)}")
+                    self._resolve(key, error=e)
+
+            try:
+                finished = decoder.step(new)
+            except Exception as e:
+                logger.error(f"Batched decoding error: {str(e)}")
+                failed = decoder.abort()
+                for sequence in failed + [s for s in new if s not in failed]:
+                    self._resolve(sequence.payload, error=e)
+                continue
+
+            for sequence in finished:
+                _, source_lang, target_lang = sequence.payload
+                try:
+                    result = translator.finish_sequence(sequence, source_lang, target_lang)
+                except Exception as e:
+                    self._resolve(sequence.payload, error=e)
+                    continue
+                self._resolve(sequence.payload, result)
+
+    def _decode(self, key: BatchKey) -> None:
+        if not self._take(key):
+            return
+
+        text, source_lang, target_lang = key
+        try:
+            with self.checkout() as translator:
+                result = translator.translate_text(text, source_lang, target_lang)
+        except Exception as e:
+            self._resolve(key, error=e)
+            return
+        self._resolve(key, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return dispatch, deduplication and batching counters."""
+        with self._lock:
+            stats = {
+                "contexts": len(self.translators),
+                "busy_contexts": len(self.translators) - self._idle.qsize(),
+                "pending": self._pending,
+                "in_flight": len(self._inflight),
+                "submitted": self._submitted,
+                "decoded": self._decoded,
+                "deduplicated": self._deduplicated,
+                "max_batch_size": self.max_batch_size if self.decoders else 1,
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+            }
+        if self.decoders:
+            decoders = [decoder.stats() for decoder in self.decoders]
+            steps = sum(d["steps"] for d in decoders)
+            stats["batched_sequences"] = sum(d["running"] for d in decoders)
+            stats["batch_steps"] = steps
+            stats["avg_batch_size"] = round(
+                sum(d["avg_sequences_per_step"] * d["steps"] for d in decoders) / steps, 2
+            ) if steps else 0.0
+            stats["max_batch_seen"] = max(d["max_sequences_seen"] for d in decoders)
+        return stats
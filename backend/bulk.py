@@ -0,0 +1,132 @@
+# backend/bulk.py
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List
+from backend.executor import get_pool, QueueFullError
+from backend.translation_engine import translate
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Unique segments of one request translated at once. Defaults to half the LLM
+# pool's workers, so a bulk request never holds every worker and interactive
+# translations always find one free.
+BULK_MAX_INFLIGHT = int(os.getenv("BULK_MAX_INFLIGHT", str(max(1, get_pool("llm").max_workers // 2))))
+# Times a segment rejected by a full LLM queue is retried after the Retry-After delay
+BULK_QUEUE_RETRIES = int(os.getenv("BULK_QUEUE_RETRIES", "3"))
+
+
+def parse_ndjson_segments(body: bytes) -> List[str]:
+    """
+    Read segments from newline-delimited JSON: one JSON string or
+    {"text": ...} object per line. Blank lines are skipped.
+    """
+    segments = []
+    for number, line in enumerate(body.decode("utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number} is not valid JSON: {str(e)}")
+        if isinstance(item, dict):
+            item = item.get("text")
+        if not isinstance(item, str):
+            raise ValueError(f"Line {number} must be a string or an object with a 'text' string")
+        segments.append(item)
+    return segments
+
+
+async def _translate_segment(
+    text: str,
+    source_language: str,
+    target_language: str,
+    inflight: asyncio.Semaphore
+) -> Dict[str, Any]:
+    async with inflight:
+        for attempt in range(BULK_QUEUE_RETRIES + 1):
+            try:
+                return await get_pool("llm").run(
+                    translate, text=text, source_lang=source_language, target_lang=target_language
+                )
+            except QueueFullError as e:
+                # Interactive requests get the queue first; wait for it to drain
+                if attempt == BULK_QUEUE_RETRIES:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+
+async def translate_bulk(
+    segments: List[str],
+    source_language: str,
+    target_language: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Translate a list of segments, yielding one result per segment in input order.
+
+    Identical segments are translated once. Unique segments are queued
+    together, so every llama context stays busy and cache and translation
+    memory hits return without waiting for the model. A result is
+    yielded as soon as it and every segment before it are done. A failed
+    segment yields an `error` event and the batch continues; a final `done`
+    event reports counts and throughput.
+    """
+    started = time.perf_counter()
+    inflight = asyncio.Semaphore(max(1, BULK_MAX_INFLIGHT))
+    tasks: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+    first_index: Dict[str, int] = {}
+    for index, text in enumerate(segments):
+        if text not in tasks:
+            first_index[text] = index
+            tasks[text] = asyncio.ensure_future(
+                _translate_segment(text, source_language, target_language, inflight)
+            )
+
+    stats = {"translated": 0, "errors": 0, "cached": 0}
+    try:
+        for index, text in enumerate(segments):
+            event: Dict[str, Any] = {"index": index, "source_text": text}
+            if first_index[text] != index:
+                event["duplicate_of"] = first_index[text]
+            try:
+                result = await tasks[text]
+            except Exception as e:
+                if first_index[text] == index:
+                    logger.error(f"Bulk translation of segment {index} failed: {str(e)}")
+                stats["errors"] += 1
+                yield {"type": "error", **event, "error": str(e)}
+                continue
+            stats["translated"] += 1
+            if result.get("cached") or result.get("model_used") == "translation-memory":
+                stats["cached"] += 1
+            yield {
+                "type": "segment",
+                **event,
+                "translated_text": result["translated_text"],
+                "backend": result.get("backend"),
+                "cached": bool(result.get("cached")),
+                "tm_match": result.get("tm_match"),
+            }
+
+        elapsed = time.perf_counter() - started
+        characters = sum(len(text) for text in segments)
+        yield {
+            "type": "done",
+            "segments": len(segments),
+            "unique_segments": len(tasks),
+            **stats,
+            "characters": characters,
+            "total_ms": round(1000 * elapsed, 2),
+            "segments_per_second": round(len(segments) / elapsed, 2) if elapsed else 0.0,
+            "characters_per_second": round(characters / elapsed, 2) if elapsed else 0.0,
+        }
+    finally:
+        # The client went away or the batch finished: drop segments not yet translated
+        for task in tasks.values():
+            if task.done() and not task.cancelled():
+                task.exception()  # already reported to the client, if it was still listening
+            task.cancel()
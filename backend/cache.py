@@ -0,0 +1,391 @@
+# backend/cache.py
+import os
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache with an optional time-to-live.
+
+    A `ttl` of 0 keeps entries until they are evicted by size. With
+    `max_bytes` set, entries are also evicted once the sizes passed to `set`
+    add up to more than `max_bytes`; an entry larger than that is not kept.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 0, max_bytes: int = 0):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires and expires < time.time():
+                del self._data[key]
+                self.bytes -= self._sizes.pop(key, 0)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int = 0) -> None:
+        expires = time.time() + self.ttl if self.ttl else 0
+        with self._lock:
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            self.bytes += size - self._sizes.pop(key, 0)
+            if size:
+                self._sizes[key] = size
+            while self._data and (
+                len(self._data) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes)
+            ):
+                evicted, _ = self._data.popitem(last=False)
+                self.bytes -= self._sizes.pop(evicted, 0)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                **({"bytes": self.bytes, "max_bytes": self.max_bytes} if self.max_bytes else {}),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteCache:
+    """
+    Persistent key/value cache stored in a SQLite database.
+
+    Values must be JSON serializable. The database runs in WAL mode so that
+    several worker processes can share one file.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, ttl: float = 0):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connect()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _connect(self) -> None:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self._conn.commit()
+        self._pid = os.getpid()
+
+    def _check_pid(self) -> None:
+        # A connection inherited over fork() must not be used; pre-forked workers reconnect
+        if self._pid != os.getpid():
+            self._connect()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            self._check_pid()
+            row = self._conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires = row
+            if expires and expires < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires = now + self.ttl if self.ttl else 0
+        with self._lock:
+            self._check_pid()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires, now)
+            )
+            self._writes += 1
+            # Pruning scans the table, so only do it every so often
+            if self._writes % 100 == 0:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now: float) -> None:
+        cursor = self._conn.execute("DELETE FROM cache WHERE expires > 0 AND expires < ?", (now,))
+        self.expirations += cursor.rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+
+    def clear(self) -> None:
+        with self._lock:
+            self._check_pid()
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._check_pid()
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": count,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class TieredCache:
+    """
+    In-memory LRU cache backed by an optional persistent tier.
+
+    Lookups try memory first, then disk; disk hits are promoted to memory.
+    Writes go to both tiers.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write to persistent cache: {str(e)}")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+def build_cache(max_entries: int, ttl: float, path: Optional[str] = None) -> TieredCache:
+    """Create a tiered cache; the persistent tier is only enabled when a path is given."""
+    disk = None
+    if path:
+        try:
+            disk = SQLiteCache(path, max_entries=max_entries * 10, ttl=ttl)
+            logger.info(f"Persistent cache enabled at {path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open persistent cache at {path}: {str(e)}")
+    return TieredCache(LRUCache(max_entries=max_entries, ttl=ttl), disk)
+
+
+class AudioFileCache:
+    """
+    Content-addressed, size-bounded cache of audio files on disk.
+
+    Files are named by a hash of their content description, written to a
+    temporary name and atomically renamed, so concurrent writers of the same
+    entry never see partial files. When the directory grows past `max_bytes`
+    the least recently used files are removed, except files pinned while
+    they are being read or sent; `unpin` releases them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = self._scan_size()
+        # Pin counts of files that must not be evicted yet
+        self._pins: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """Hash the parts that determine the audio content into a cache key."""
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def _pin(self, path: str) -> None:
+        self._pins[path] = self._pins.get(path, 0) + 1
+
+    def unpin(self, path: str) -> None:
+        """Release a pin taken by get, peek or put; other paths are ignored."""
+        with self._lock:
+            count = self._pins.get(path, 0)
+            if count > 1:
+                self._pins[path] = count - 1
+            else:
+                self._pins.pop(path, None)
+
+    def get(self, key: str, extension: str, pin: bool = False) -> Optional[str]:
+        """Return the cached file path, or None on a miss. With pin, the file is kept until unpin."""
+        path = self.path_for(key, extension)
+        with self._lock:
+            try:
+                os.utime(path)  # mark as recently used
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if pin:
+                self._pin(path)
+        return path
+
+    def peek(self, key: str, extension: str, pin: bool = False) -> Optional[str]:
+        """Like get, for serving an entry again: not counted as a hit or miss."""
+        path = self.path_for(key, extension)
+        with self._lock:
+            if not os.path.exists(path):
+                return None
+            if pin:
+                self._pin(path)
+        return path
+
+    def put(self, key: str, extension: str, write: Callable[[str], None], pin: bool = False) -> str:
+        """Create an entry by calling write(tmp_path) and atomically moving it into place."""
+        path = self.path_for(key, extension)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            write(tmp_path)
+            # Replace under the lock so concurrent writers of one key count the file once
+            with self._lock:
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                self._size += os.path.getsize(path) - replaced
+                if pin:
+                    self._pin(path)
+                over_budget = self._size > self.max_bytes
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if over_budget:
+            self._evict(keep=path)
+        return path
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    info = entry.stat()
+                    entries.append((info.st_mtime, info.st_size, entry.path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep: str) -> None:
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep or path in self._pins:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+            self._size = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
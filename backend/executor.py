@@ -0,0 +1,229 @@
+# backend/executor.py
+import os
+import time
+import asyncio
+import contextvars
+import functools
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+from backend.metrics import record_queue_wait
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_STREAM_END = object()
+
+# Worker and admission queue sizes per stage (overridable through the environment)
+STAGE_DEFAULTS = {
+    "llm": {"workers": 8, "queue": 16},  # waits on the translation scheduler
+    "whisper": {"workers": 1, "queue": 8},
+    "tts": {"workers": 4, "queue": 16},
+}
+
+
+class QueueFullError(Exception):
+    """Raised when a stage's admission queue is full and the request is rejected."""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"The '{stage}' stage is overloaded. Retry in {retry_after}s.")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StagePool:
+    """
+    A bounded thread pool for one blocking inference stage.
+
+    At most `max_workers` calls run at once and at most `max_queue` more wait
+    for a free worker. Anything beyond that is rejected immediately with
+    QueueFullError instead of piling up on the event loop.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"{name}-worker"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0  # queued + running
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._service_total = 0.0
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(self.name, self.retry_after())
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, submitted: float, func: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        wait = started - submitted
+        with self._lock:
+            self._running += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        record_queue_wait(self.name, wait)
+        ok = False
+        try:
+            result = func()
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._service_total += elapsed
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable on this stage's workers and await its result."""
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(func, *args, **kwargs)
+            # Copy the context so per-request metrics see the stages run on the worker
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(context.run, self._call, time.perf_counter(), call)
+            )
+        finally:
+            self._release()
+
+    def stream(
+        self,
+        func: Callable[..., Iterator[Any]],
+        *args,
+        cancellable: bool = False,
+        **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Run a blocking generator on this stage's workers and iterate it asynchronously.
+
+        Admission is checked immediately, so QueueFullError is raised before
+        any response has started. Items are handed to the event loop as the
+        worker produces them; if the consumer stops early the generator is closed.
+
+        The consumer stops when the returned iterator is closed (`aclose()`,
+        e.g. in a `finally` when the client disconnects) or cancelled. With
+        `cancellable`, func is also called with `cancel=<threading.Event>`, set
+        at that moment, so it can stop between tokens rather than at its next item.
+        """
+        self._admit()
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+        if cancellable:
+            kwargs["cancel"] = stopped
+
+        def _produce() -> None:
+            generator = func(*args, **kwargs)
+            try:
+                for item in generator:
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(items.put_nowait, (item, None))
+            except Exception as e:
+                loop.call_soon_threadsafe(items.put_nowait, (_STREAM_END, e))
+                raise
+            finally:
+                close = getattr(generator, "close", None)
+                if close is not None:
+                    close()
+            loop.call_soon_threadsafe(items.put_nowait, (_STREAM_END, None))
+
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(
+            self._executor,
+            functools.partial(context.run, self._call, time.perf_counter(), _produce)
+        )
+
+        def _finished(done: "asyncio.Future") -> None:
+            self._release()
+            if not done.cancelled():
+                done.exception()  # already delivered to the consumer
+
+        future.add_done_callback(_finished)
+
+        async def _consume() -> AsyncIterator[Any]:
+            try:
+                while True:
+                    item, error = await items.get()
+                    if item is _STREAM_END:
+                        if error is not None:
+                            raise error
+                        return
+                    yield item
+            finally:
+                stopped.set()
+
+        return _consume()
+
+    def retry_after(self) -> int:
+        """Estimate how many seconds it takes for the current backlog to drain."""
+        finished = self._completed + self._failed
+        avg_service = self._service_total / finished if finished else 1.0
+        backlog = max(self._pending, 1)
+        return max(1, int(round(avg_service * backlog / self.max_workers)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of queue depth, wait times and counters for this stage."""
+        with self._lock:
+            finished = self._completed + self._failed
+            started = finished + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(1000 * self._wait_total / started, 2) if started else 0.0,
+                "max_wait_ms": round(1000 * self._wait_max, 2),
+                "avg_service_ms": round(1000 * self._service_total / finished, 2) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def _stage_setting(stage: str, setting: str) -> int:
+    env_name = f"{stage.upper()}_{setting.upper()}"
+    return int(os.getenv(env_name, STAGE_DEFAULTS[stage][setting]))
+
+
+# One pool per inference stage, e.g. LLM_WORKERS=2 LLM_QUEUE=16
+pools: Dict[str, StagePool] = {
+    stage: StagePool(stage, _stage_setting(stage, "workers"), _stage_setting(stage, "queue"))
+    for stage in STAGE_DEFAULTS
+}
+
+
+def get_pool(stage: str) -> StagePool:
+    """Return the worker pool for the given stage ('llm', 'whisper' or 'tts')."""
+    return pools[stage]
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return queue statistics for every stage."""
+    return {name: pool.stats() for name, pool in pools.items()}
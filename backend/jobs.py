@@ -0,0 +1,259 @@
+# backend/jobs.py
+import io
+import os
+import time
+import uuid
+import threading
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+from backend.cache import SQLiteCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Batch transcription worker pool: processes, Whisper model size and
+# per-process CTranslate2 threads / parallel transcriptions
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+JOB_WHISPER_MODEL = os.getenv("JOB_WHISPER_MODEL", "base")
+JOB_CPU_THREADS = int(os.getenv("JOB_CPU_THREADS", "2"))
+JOB_NUM_WORKERS = int(os.getenv("JOB_NUM_WORKERS", "1"))
+JOB_START_METHOD = os.getenv("JOB_START_METHOD", "spawn")
+MAX_JOBS = int(os.getenv("MAX_JOBS", "100"))
+# SQLite file holding job progress and results, so any pre-forked worker can
+# answer for a job that runs in another one (empty keeps jobs in memory only)
+JOBS_PATH = os.getenv("JOBS_PATH", "")
+JOB_RETENTION_S = float(os.getenv("JOB_RETENTION_S", "86400"))
+SAMPLE_RATE = 16000
+
+# Each worker process holds its own Whisper model
+_worker_model = None
+
+
+def _init_worker(model_size: str, cpu_threads: int, num_workers: int) -> None:
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(
+        model_size,
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=cpu_threads,
+        num_workers=num_workers
+    )
+
+
+def _transcribe_file(audio_bytes: bytes, language: Optional[str]) -> Dict[str, Any]:
+    """Transcribe one recording inside a worker process."""
+    from faster_whisper import decode_audio
+    audio = decode_audio(io.BytesIO(audio_bytes), sampling_rate=SAMPLE_RATE)
+    started = time.perf_counter()
+    segments, info = _worker_model.transcribe(audio, language=language)
+    segments = list(segments)
+    return {
+        "text": " ".join(segment.text for segment in segments).strip(),
+        "language": info.language,
+        "duration": len(audio) / SAMPLE_RATE,
+        "processing_time": time.perf_counter() - started,
+        "segments": [{"text": s.text, "start": s.start, "end": s.end} for s in segments]
+    }
+
+
+class TranscriptionJob:
+    """A batch of recordings transcribed by the worker pool."""
+
+    def __init__(self, job_id: str, filenames: List[str], language: Optional[str]):
+        self.job_id = job_id
+        self.language = language
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+        self.files: List[Dict[str, Any]] = [
+            {"filename": name, "status": "queued"} for name in filenames
+        ]
+        self.futures: List[Future] = []
+
+    def cancel(self) -> None:
+        """Drop the files that have not started transcribing yet."""
+        for future in self.futures:
+            future.cancel()
+
+    def file_done(self, index: int, future: Future) -> None:
+        error = None if future.cancelled() else future.exception()
+        with self._lock:
+            if future.cancelled():
+                self.files[index].update(status="cancelled")
+            elif error is None:
+                self.files[index].update(status="completed", **future.result())
+            else:
+                logger.error(f"Job {self.job_id}: {self.files[index]['filename']} failed: {str(error)}")
+                self.files[index].update(status="failed", error=str(error))
+            if all(f["status"] in ("completed", "failed", "cancelled") for f in self.files):
+                self.finished = time.time()
+
+    def record(self) -> Dict[str, Any]:
+        """Serializable snapshot for the shared job store."""
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "language": self.language,
+                "created": self.created,
+                "finished": self.finished,
+                "files": [dict(f) for f in self.files]
+            }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "TranscriptionJob":
+        job = cls(record["job_id"], [], record["language"])
+        job.created = record["created"]
+        job.finished = record["finished"]
+        job.files = record["files"]
+        return job
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = [f for f in self.files if f["status"] == "completed"]
+            failed = sum(1 for f in self.files if f["status"] == "failed")
+            cancelled = sum(1 for f in self.files if f["status"] == "cancelled")
+            audio_seconds = sum(f["duration"] for f in completed)
+            elapsed = (self.finished or time.time()) - self.created
+            return {
+                "job_id": self.job_id,
+                "status": "completed" if self.finished else "running",
+                "total": len(self.files),
+                "completed": len(completed),
+                "failed": failed,
+                "cancelled": cancelled,
+                "progress": round((len(completed) + failed + cancelled) / len(self.files), 4),
+                "audio_seconds": round(audio_seconds, 2),
+                "elapsed_seconds": round(elapsed, 2),
+                # Audio seconds transcribed per wall-clock second
+                "throughput": round(audio_seconds / elapsed, 2) if elapsed > 0 else 0.0
+            }
+
+    def results(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(f) for f in self.files]
+
+
+class TranscriptionJobManager:
+    """
+    Creates jobs, spreads their files over the process pool and keeps recent jobs.
+
+    Beyond `max_jobs`, the oldest finished job is forgotten; if every job is
+    still running, the oldest one is evicted and its queued files are cancelled.
+
+    If a worker process dies (e.g. killed for memory), the pool is broken:
+    every file it held fails, and the pool is replaced for later files.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        model_size: str = JOB_WHISPER_MODEL,
+        cpu_threads: int = JOB_CPU_THREADS,
+        num_workers: int = JOB_NUM_WORKERS,
+        max_jobs: int = MAX_JOBS,
+        path: str = JOBS_PATH
+    ):
+        self.workers = workers
+        self.model_size = model_size
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.max_jobs = max_jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, TranscriptionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = SQLiteCache(path, max_entries=max_jobs, ttl=JOB_RETENTION_S) if path else None
+        # Snapshot and write together, so a slower callback never stores an older state
+        self._store_lock = threading.Lock()
+
+    def _save(self, job: TranscriptionJob) -> None:
+        if self._store is None:
+            return
+        try:
+            with self._store_lock:
+                self._store.set(job.job_id, job.record())
+        except Exception as e:
+            logger.error(f"Failed to store job {job.job_id}: {str(e)}")
+
+    def _file_done(self, job: TranscriptionJob, index: int, future: Future, executor: ProcessPoolExecutor) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._reset_executor(executor)
+        job.file_done(index, future)
+        self._save(job)
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next file starts a new one."""
+        with self._lock:
+            if self._executor is not broken:
+                return  # already replaced
+            self._executor = None
+        logger.error("A transcription worker died; its queued files failed and the pool will be restarted")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_file(self, audio_bytes: bytes, language: Optional[str]) -> Tuple[Future, ProcessPoolExecutor]:
+        """Queue one file, restarting the pool once if it is broken; a failed Future if that fails too."""
+        for _ in range(2):
+            with self._lock:
+                executor = self._get_executor()
+            try:
+                return executor.submit(_transcribe_file, audio_bytes, language), executor
+            except BrokenProcessPool as e:
+                self._reset_executor(executor)
+                error = e
+        future: Future = Future()
+        future.set_exception(error)
+        return future, executor
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Started on first use so the API process does not pay for idle workers
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(JOB_START_METHOD),
+                initializer=_init_worker,
+                initargs=(self.model_size, self.cpu_threads, self.num_workers)
+            )
+            logger.info(f"Started {self.workers} transcription workers ({self.model_size}, {self.cpu_threads} threads each)")
+        return self._executor
+
+    def submit(self, files: List[Tuple[str, bytes]], language: Optional[str] = None) -> TranscriptionJob:
+        job = TranscriptionJob(uuid.uuid4().hex, [name for name, _ in files], language)
+        evicted: List[TranscriptionJob] = []
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                finished = next((j for j in self._jobs.values() if j.finished), None)
+                oldest = finished or next(iter(self._jobs.values()))
+                evicted.append(self._jobs.pop(oldest.job_id))
+        for old_job in evicted:
+            if not old_job.finished:
+                logger.warning(f"Job {old_job.job_id} evicted while running, cancelling its queued files")
+                old_job.cancel()
+        self._save(job)
+        for index, (_, audio_bytes) in enumerate(files):
+            future, executor = self._submit_file(audio_bytes, language)
+            job.futures.append(future)
+            future.add_done_callback(lambda done, i=index, e=executor: self._file_done(job, i, done, e))
+        return job
+
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        """A job of this process, or a snapshot of one submitted to another worker."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            record = self._store.get(job_id)
+            if record is not None:
+                job = TranscriptionJob.from_record(record)
+        return job
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+job_manager = TranscriptionJobManager()
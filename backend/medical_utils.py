@@ -1,12 +1,270 @@
-from typing import List
+import os
+import sys
+import struct
+import logging
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Terminology file: one term per line, optionally "term<TAB>language<TAB>category".
+# A compiled index (written by TermIndex.save) is loaded directly when the path ends in .idx.
+MEDICAL_TERMS_PATH = os.getenv("MEDICAL_TERMS_PATH", "")
+
+DEFAULT_MEDICAL_TERMS = [
+    "hypertension", "diabetes", "myocardial",
+    "infarction", "antibiotics", "analgesic"
+]
+
+_INDEX_MAGIC = b"MTIX"
+_INDEX_VERSION = 1
+
+
+class TermMatch(NamedTuple):
+    term: str
+    start: int
+    end: int
+    language: str
+    category: str
+
+
+def _fold(ch: str) -> str:
+    """Lower-case one character without changing the text length."""
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+
+def _is_word_char(ch: str) -> bool:
+    """Letters and digits of scripts that separate words with spaces (CJK does not)."""
+    return ch.isalnum() and ord(ch) < 0x2E80
+
+
+class TermIndex:
+    """
+    Aho-Corasick automaton over a medical terminology.
+
+    All (possibly overlapping, multi-word) terms are found in a single
+    left-to-right pass, case-insensitively, with character offsets into the
+    original text. The automaton is stored in flat integer arrays so it can
+    be saved to and loaded from a compact binary file.
+    """
+
+    def __init__(self):
+        self.terms: List[str] = []
+        self.languages: List[str] = []
+        self.categories: List[str] = []
+        # Transitions of node n are labels/targets[edge_start[n]:edge_start[n + 1]], sorted by label
+        self.edge_start = array("I", [0, 0])
+        self.edge_labels = array("I")
+        self.edge_targets = array("I")
+        self.fail = array("I", [0])
+        # Term ids ending at node n are out_terms[out_start[n]:out_start[n + 1]];
+        # out_link[n] is the nearest node on the fail chain that has terms (0 if none)
+        self.out_start = array("I", [0, 0])
+        self.out_terms = array("I")
+        self.out_link = array("I", [0])
+        self._root: Dict[int, int] = {}
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, str, str]]) -> "TermIndex":
+        """Build an index from (term, language, category) entries."""
+        index = cls()
+        children: List[Dict[int, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        seen: Dict[Tuple[str, str], int] = {}
+        for term, language, category in entries:
+            folded = "".join(_fold(ch) for ch in term.strip())
+            if not folded or (folded, language) in seen:
+                continue
+            term_id = len(index.terms)
+            seen[(folded, language)] = term_id
+            index.terms.append(term.strip())
+            index.languages.append(language)
+            index.categories.append(category)
+            node = 0
+            for ch in folded:
+                code = ord(ch)
+                nxt = children[node].get(code)
+                if nxt is None:
+                    nxt = len(children)
+                    children[node][code] = nxt
+                    children.append({})
+                    outputs.append([])
+                node = nxt
+            outputs[node].append(term_id)
+
+        n_nodes = len(children)
+        fail = [0] * n_nodes
+        out_link = [0] * n_nodes
+        queue = deque(children[0].values())
+        while queue:
+            node = queue.popleft()
+            for code, child in children[node].items():
+                state = fail[node]
+                while state and code not in children[state]:
+                    state = fail[state]
+                target = children[state].get(code, 0)
+                fail[child] = target if target != child else 0
+                out_link[child] = fail[child] if outputs[fail[child]] else out_link[fail[child]]
+                queue.append(child)
+
+        index.edge_start = array("I", [0] * (n_nodes + 1))
+        index.out_start = array("I", [0] * (n_nodes + 1))
+        for node in range(n_nodes):
+            for code in sorted(children[node]):
+                index.edge_labels.append(code)
+                index.edge_targets.append(children[node][code])
+            index.edge_start[node + 1] = len(index.edge_labels)
+            index.out_terms.extend(outputs[node])
+            index.out_start[node + 1] = len(index.out_terms)
+        index.fail = array("I", fail)
+        index.out_link = array("I", out_link)
+        index._root = dict(children[0])
+        return index
+
+    @classmethod
+    def from_file(cls, path: str, default_language: str = "en") -> "TermIndex":
+        """Load a compiled .idx file, or build the index from a terminology text file."""
+        if path.endswith(".idx"):
+            return cls.load(path)
+
+        def _entries():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    fields = line.split("\t")
+                    language = fields[1] if len(fields) > 1 and fields[1] else default_language
+                    category = fields[2] if len(fields) > 2 else ""
+                    yield fields[0], language, category
+
+        return cls.build(_entries())
+
+    def _next(self, node: int, code: int) -> int:
+        """Follow the goto/fail transitions for one character."""
+        while True:
+            if node == 0:
+                return self._root.get(code, 0)
+            lo, hi = self.edge_start[node], self.edge_start[node + 1]
+            i = bisect_left(self.edge_labels, code, lo, hi)
+            if i < hi and self.edge_labels[i] == code:
+                return self.edge_targets[i]
+            node = self.fail[node]
+
+    def find_all(self, text: str, whole_words: bool = True) -> List[TermMatch]:
+        """
+        Return every term occurrence in text, in order of end offset.
+
+        With whole_words, matches starting or ending inside a word are skipped.
+        """
+        matches = []
+        terms, out_start, out_terms, out_link = self.terms, self.out_start, self.out_terms, self.out_link
+        node = 0
+        for position, ch in enumerate(text):
+            node = self._next(node, ord(_fold(ch)))
+            state = node if out_start[node] != out_start[node + 1] else out_link[node]
+            while state:
+                end = position + 1
+                for k in range(out_start[state], out_start[state + 1]):
+                    term_id = out_terms[k]
+                    start = end - len(terms[term_id])
+                    if whole_words and (
+                        (start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]))
+                        or (end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]))
+                    ):
+                        continue
+                    matches.append(TermMatch(
+                        text[start:end], start, end, self.languages[term_id], self.categories[term_id]
+                    ))
+                state = out_link[state]
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def save(self, path: str) -> None:
+        """Write the automaton to a compact binary file for fast startup."""
+        strings = "\x00".join(self.terms + self.languages + self.categories).encode("utf-8")
+        arrays = [self.edge_start, self.edge_labels, self.edge_targets, self.fail,
+                  self.out_start, self.out_terms, self.out_link]
+        with open(path, "wb") as f:
+            f.write(_INDEX_MAGIC)
+            f.write(struct.pack("<HII", _INDEX_VERSION, len(self.terms), len(strings)))
+            f.write(struct.pack("<" + "I" * len(arrays), *(len(a) for a in arrays)))
+            f.write(strings)
+            for a in arrays:
+                if sys.byteorder == "big":
+                    a = array("I", a)
+                    a.byteswap()
+                f.write(a.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "TermIndex":
+        """Load an automaton written by save()."""
+        index = cls()
+        with open(path, "rb") as f:
+            if f.read(4) != _INDEX_MAGIC:
+                raise ValueError(f"{path} is not a terminology index")
+            version, n_terms, strings_size = struct.unpack("<HII", f.read(10))
+            if version != _INDEX_VERSION:
+                raise ValueError(f"Unsupported terminology index version {version}")
+            sizes = struct.unpack("<IIIIIII", f.read(28))
+            strings = f.read(strings_size).decode("utf-8").split("\x00")
+            loaded = []
+            for size in sizes:
+                a = array("I")
+                a.frombytes(f.read(size * a.itemsize))
+                if sys.byteorder == "big":
+                    a.byteswap()
+                loaded.append(a)
+        index.terms = strings[:n_terms]
+        index.languages = strings[n_terms:2 * n_terms]
+        index.categories = strings[2 * n_terms:3 * n_terms]
+        (index.edge_start, index.edge_labels, index.edge_targets, index.fail,
+         index.out_start, index.out_terms, index.out_link) = loaded
+        lo, hi = index.edge_start[0], index.edge_start[1]
+        index._root = dict(zip(index.edge_labels[lo:hi], index.edge_targets[lo:hi]))
+        return index
+
+
+_default_index: Optional[TermIndex] = None
+
+
+def get_term_index() -> TermIndex:
+    """Return the terminology index, building it on first use."""
+    global _default_index
+    if _default_index is None:
+        if MEDICAL_TERMS_PATH:
+            _default_index = TermIndex.from_file(MEDICAL_TERMS_PATH)
+            logger.info(f"Loaded {len(_default_index)} medical terms from {MEDICAL_TERMS_PATH}")
+        else:
+            _default_index = TermIndex.build((term, "en", "") for term in DEFAULT_MEDICAL_TERMS)
+    return _default_index
+
+
+def find_medical_terms(text: str) -> List[TermMatch]:
+    """Return every medical term in text with its character offsets."""
+    return get_term_index().find_all(text)
+
 
 def extract_medical_terms(text: str) -> List[str]:
     """
     Identify medical terms in transcript
     Returns a list of medical terms found in the text
     """
-    medical_terms = [
-        "hypertension", "diabetes", "myocardial", 
-        "infarction", "antibiotics", "analgesic"
-    ]
-    return [term for term in text.lower().split() if term in medical_terms]
\ No newline at end of file
+    return [match.term.lower() for match in find_medical_terms(text)]
+
+
+if __name__ == "__main__":
+    # CLI to compile a terminology file into a binary index for fast startup
+    if len(sys.argv) != 3:
+        print("Usage: python -m backend.medical_utils <terms.tsv> <output.idx>")
+        sys.exit(1)
+    compiled = TermIndex.from_file(sys.argv[1])
+    compiled.save(sys.argv[2])
+    print(f"Compiled {len(compiled)} terms into {sys.argv[2]} ({os.path.getsize(sys.argv[2])} bytes)")
@@ -0,0 +1,306 @@
+# backend/metrics.py
+import os
+import time
+import threading
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Add a Server-Timing header with the per-stage timings to every HTTP response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+METRIC_PREFIX = "medassis_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+# Stage timings of the request being handled; worker pools copy the context into their threads
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for metrics rendered in the Prometheus text format."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], LabelValues, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labelnames, values, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for values, value in items:
+            yield self.name, self.labelnames, values, value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[LabelValues, List[float]] = {}  # bucket counts, then sum
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0]
+            state[bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(values, list(state)) for values, state in self._values.items()]
+        labelnames = self.labelnames + ("le",)
+        for values, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket", labelnames, values + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", self.labelnames, values, state[-1]
+            yield f"{self.name}_count", self.labelnames, values, cumulative
+
+
+class CallbackMetric(Metric):
+    """A counter or gauge read from existing statistics at scrape time."""
+
+    def __init__(self, name: str, kind: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Dict[LabelValues, float]]):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self):
+        try:
+            values = self.collect()
+        except Exception as e:
+            logger.error(f"Failed to collect metric {self.name}: {str(e)}")
+            return
+        for key, value in values.items():
+            yield self.name, self.labelnames, tuple(str(v) for v in key), value
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for the /metrics endpoint."""
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, kind: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Dict[LabelValues, float]]) -> CallbackMetric:
+        return self._register(CallbackMetric(self.prefix + name, kind, documentation, labelnames, collect))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"])
+http_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response body is sent.", ["method", "route"])
+stage_duration = metrics.histogram(
+    "stage_duration_seconds", "Time spent in each processing stage (upload, decode, asr, translate, synthesis, encode).",
+    ["stage"])
+queue_wait = metrics.histogram(
+    "queue_wait_seconds", "Time calls waited for a free worker in each inference pool.", ["pool"])
+llama_tokens = metrics.counter(
+    "llama_tokens_total", "Tokens processed by the translation model.", ["kind"])
+llama_tokens_per_second = metrics.histogram(
+    "llama_generation_tokens_per_second", "Generated tokens per second of each translation.", [],
+    buckets=(1, 2, 5, 10, 20, 35, 50, 75, 100, 200))
+whisper_audio = metrics.counter(
+    "whisper_audio_seconds_total", "Seconds of audio transcribed by Whisper.")
+whisper_rtf = metrics.histogram(
+    "whisper_real_time_factor", "Whisper processing time divided by audio duration.", [],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0))
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record a stage duration globally and on the current request."""
+    stage_duration.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as one processing stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def record_queue_wait(pool: str, seconds: float) -> None:
+    queue_wait.observe(seconds, pool=pool)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((f"{pool}_queue", seconds))
+
+
+def record_llama_generation(prompt_tokens: int, completion_tokens: int, seconds: float) -> None:
+    llama_tokens.inc(prompt_tokens, kind="prompt")
+    llama_tokens.inc(completion_tokens, kind="completion")
+    if completion_tokens and seconds > 0:
+        llama_tokens_per_second.observe(completion_tokens / seconds)
+
+
+def record_whisper(audio_seconds: float, seconds: float) -> None:
+    whisper_audio.inc(audio_seconds)
+    if audio_seconds > 0:
+        whisper_rtf.observe(seconds / audio_seconds)
+
+
+def server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    """Format stage timings as a Server-Timing header, summing repeated stages."""
+    merged: Dict[str, float] = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    entries = [f"{name};dur={1000 * seconds:.1f}" for name, seconds in merged.items()]
+    entries.append(f"total;dur={1000 * total:.1f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times every HTTP request.
+
+    Records latency and status per route, the time spent receiving the request
+    body as the "upload" stage, and collects the stage timings recorded while
+    the request is handled (optionally returned in a Server-Timing header).
+    """
+
+    def __init__(self, app, server_timing_header: bool = SERVER_TIMING):
+        self.app = app
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        status = {"code": 500, "received": 0}
+
+        async def timed_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                status["received"] += len(message.get("body", b""))
+                if status["received"] and not message.get("more_body"):
+                    record_stage("upload", time.perf_counter() - started)
+            return message
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if self.server_timing_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((
+                        b"server-timing",
+                        server_timing(timings, time.perf_counter() - started).encode("latin-1")
+                    ))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, timed_receive, timed_send)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            http_requests.inc(method=scope["method"], route=route_path, status=status["code"])
+            http_duration.observe(time.perf_counter() - started, method=scope["method"], route=route_path)
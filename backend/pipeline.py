@@ -0,0 +1,132 @@
+# backend/pipeline.py
+import os
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+from backend.executor import get_pool
+from backend.stt import iter_transcript_segments, translate_transcript
+from backend.tts import synthesize_speech
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Segments translated and synthesized at once per request; keeps long recordings
+# from flooding the LLM and TTS queues
+PIPELINE_MAX_INFLIGHT = int(os.getenv("PIPELINE_MAX_INFLIGHT", "4"))
+
+
+async def _process_segment(
+    index: int,
+    segment: Dict[str, Any],
+    input_language: str,
+    output_language: str
+) -> Dict[str, Any]:
+    """Translate one transcript segment on the LLM pool and synthesize it on the TTS pool."""
+    started = time.perf_counter()
+    result = {
+        "type": "segment",
+        "index": index,
+        "start": segment["start"],
+        "end": segment["end"],
+        "original_text": segment["text"],
+    }
+    try:
+        translated_text = await get_pool("llm").run(
+            translate_transcript, segment["text"], input_language, output_language
+        )
+        speech = await get_pool("tts").run(synthesize_speech, translated_text, output_language)
+        result.update({
+            "translated_text": translated_text,
+            "audio_id": speech["audio_id"],
+            "audio_url": f"/tts/audio/{speech['audio_id']}",
+            "cached_audio": speech["cached"],
+        })
+    except Exception as e:
+        logger.error(f"Pipeline segment {index} failed: {str(e)}")
+        result.update({"type": "error", "error": str(e)})
+    result["elapsed_ms"] = round(1000 * (time.perf_counter() - started), 2)
+    return result
+
+
+async def _run_pipeline(
+    segments: AsyncIterator[Dict[str, Any]],
+    input_language: str,
+    output_language: str,
+    started: float
+) -> AsyncIterator[Dict[str, Any]]:
+    # Segment tasks in transcript order; None marks the end of the transcript
+    pending: asyncio.Queue = asyncio.Queue()
+    stats = {"segments": 0, "errors": 0, "audio_seconds": 0.0}
+    inflight = asyncio.Semaphore(max(1, PIPELINE_MAX_INFLIGHT))
+
+    async def _transcribe() -> None:
+        try:
+            async for segment in segments:
+                if not segment["text"]:
+                    continue
+                stats["audio_seconds"] = segment["end"]
+                await inflight.acquire()
+                task = asyncio.ensure_future(
+                    _process_segment(stats["segments"], segment, input_language, output_language)
+                )
+                task.add_done_callback(lambda _: inflight.release())
+                stats["segments"] += 1
+                pending.put_nowait(task)
+        except Exception as e:
+            logger.error(f"Pipeline transcription failed: {str(e)}")
+            pending.put_nowait(e)
+        finally:
+            pending.put_nowait(None)
+            # Stops the Whisper worker when the pipeline is cancelled mid-stream
+            await segments.aclose()
+
+    producer = asyncio.ensure_future(_transcribe())
+    first_segment_ms: Optional[float] = None
+    try:
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                stats["errors"] += 1
+                yield {"type": "error", "error": str(item)}
+                continue
+            result = await item
+            if result["type"] == "error":
+                stats["errors"] += 1
+            if first_segment_ms is None:
+                first_segment_ms = round(1000 * (time.perf_counter() - started), 2)
+            yield result
+        yield {
+            "type": "done",
+            **stats,
+            "first_segment_ms": first_segment_ms,
+            "total_ms": round(1000 * (time.perf_counter() - started), 2),
+        }
+    finally:
+        # The client went away or the pipeline finished: stop transcribing and drop queued segments
+        producer.cancel()
+        while not pending.empty():
+            item = pending.get_nowait()
+            if isinstance(item, asyncio.Future):
+                item.cancel()
+
+
+def speech_to_speech(
+    audio_bytes: bytes,
+    input_language: str = "en",
+    output_language: str = "en"
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Transcribe, translate and synthesize a recording as a segment pipeline.
+
+    Each transcript segment is translated and synthesized while Whisper is
+    still working on the next one, and results are yielded in order as soon
+    as they are ready. Admission to the Whisper pool is checked immediately,
+    so QueueFullError is raised before any result is produced.
+    """
+    started = time.perf_counter()
+    segments = get_pool("whisper").stream(iter_transcript_segments, audio_bytes, input_language)
+    return _run_pipeline(segments, input_language, output_language, started)
@@ -0,0 +1,108 @@
+# backend/rate_limit.py
+import os
+import time
+import sqlite3
+import threading
+import logging
+from typing import Optional
+from limits.storage import Storage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Where slowapi keeps its counters. The default is per process; several workers need
+# a shared backend such as redis://host:6379 or the local sqlite:// stand-in below.
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+
+
+class SQLiteStorage(Storage):
+    """
+    Rate limit counters in a SQLite file shared by every worker on one host.
+
+    Registered for `sqlite://<path>` storage URIs (`sqlite:///abs/path.db`
+    or `sqlite://relative/path.db`). Supports the fixed-window strategy
+    slowapi uses by default. Each process opens its own connection, so the
+    storage stays valid across fork().
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = (uri or "sqlite://rate_limits.db")[len("sqlite://"):]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            # A connection inherited over fork() must not be used by the child
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS limits (key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires REAL NOT NULL)"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT count, expires FROM limits WHERE key = ?", (key,)).fetchone()
+                if row is None or row[1] <= now:
+                    count = amount
+                    conn.execute(
+                        "INSERT OR REPLACE INTO limits (key, count, expires) VALUES (?, ?, ?)",
+                        (key, count, now + expiry)
+                    )
+                else:
+                    count = row[0] + amount
+                    conn.execute("UPDATE limits SET count = ? WHERE key = ?", (count, key))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT count FROM limits WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT expires FROM limits WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM limits")
+        return cursor.rowcount
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM limits WHERE key = ?", (key,))
@@ -0,0 +1,113 @@
+# backend/registry.py
+import os
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Models loaded in the background at startup; everything else loads on first use.
+# A worker that only serves /tts can run with WARMUP_MODELS="".
+WARMUP_MODELS = [name.strip() for name in os.getenv("WARMUP_MODELS", "whisper,translator").split(",") if name.strip()]
+
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+class _ModelEntry:
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.state = STATE_PENDING
+        self.instance: Any = None
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class ModelRegistry:
+    """
+    Loads models on first use or from a background warm-up thread.
+
+    Each model is registered with a zero-argument loader. Concurrent callers
+    of get() for a model that is still loading wait for that single load.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        self._entries[name] = _ModelEntry(name, loader)
+
+    def override(self, name: str, loader: Callable[[], Any]) -> None:
+        """Replace a model's loader (e.g. with a stub) and drop any loaded instance."""
+        self.register(name, loader)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        if entry.state == STATE_READY:
+            return entry.instance
+        with entry.lock:
+            if entry.state != STATE_READY:
+                entry.state = STATE_LOADING
+                started = time.perf_counter()
+                try:
+                    entry.instance = entry.loader()
+                except Exception as e:
+                    entry.state = STATE_FAILED
+                    entry.error = str(e)
+                    logger.error(f"Failed to load model '{name}': {str(e)}")
+                    raise
+                entry.load_seconds = time.perf_counter() - started
+                entry.error = None
+                entry.state = STATE_READY
+                logger.info(f"Model '{name}' loaded in {entry.load_seconds:.2f}s")
+        return entry.instance
+
+    def is_ready(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == STATE_READY
+
+    def peek(self, name: str) -> Any:
+        """Return the model if it is already loaded, without triggering a load."""
+        entry = self._entries.get(name)
+        return entry.instance if entry is not None and entry.state == STATE_READY else None
+
+    def warm_up(self, names: Iterable[str]) -> threading.Thread:
+        """Load the given models one after another on a background thread."""
+        names = list(names)
+
+        def _load_all() -> None:
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    pass  # already logged; the model retries on first use
+
+        thread = threading.Thread(target=_load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def ready(self, names: Iterable[str]) -> bool:
+        return all(self.is_ready(name) for name in names)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "state": entry.state,
+                "load_seconds": round(entry.load_seconds, 3) if entry.load_seconds is not None else None,
+                "error": entry.error,
+            }
+            for name, entry in self._entries.items()
+        }
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+
+registry = ModelRegistry()
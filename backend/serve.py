@@ -0,0 +1,205 @@
+# backend/serve.py
+"""
+Pre-fork multi-worker server.
+
+The parent process imports the app, loads the fork-safe models listed in
+PRELOAD_MODELS, binds the listening socket and then forks the workers, so
+the workers share the parent's memory pages copy-on-write. Dead workers are
+restarted; SIGTERM/SIGINT stop all of them.
+
+    python -m backend.serve --workers 4 --port 8000
+"""
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+from typing import Dict, Iterable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "2"))
+# Models loaded once in the parent before forking. The llama weights are
+# memory-mapped and shared in any case; preloading also shares the loaded
+# context and skips the per-worker load time.
+PRELOAD_MODELS = [name.strip() for name in os.getenv("PRELOAD_MODELS", "translator").split(",") if name.strip()]
+# CTranslate2 starts its worker threads when a model is loaded, and threads do
+# not survive fork(), so Whisper is always loaded inside each worker
+FORK_UNSAFE_MODELS = {"whisper", "whisper_batched"}
+# Files for state shared by all workers (rate limits, caches, translation memory, jobs)
+SHARED_STATE_DIR = os.getenv(
+    "SHARED_STATE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "temp", "shared")
+)
+# Log the memory of every worker this often (seconds, 0 disables)
+SERVE_MEMORY_LOG_S = float(os.getenv("SERVE_MEMORY_LOG_S", "0"))
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """
+    Memory of a process in bytes from /proc/<pid>/smaps_rollup (Linux).
+
+    Rss counts every resident page; Pss divides shared pages between the
+    processes sharing them, so summing Pss over the workers gives the real total.
+    """
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in _SMAPS_FIELDS:
+                memory[name.lower()] = int(rest.split()[0]) * 1024
+    return memory
+
+
+def memory_report(pids: Iterable[int]) -> Dict[str, Dict[str, int]]:
+    """Memory of each process, plus the totals over all of them."""
+    report: Dict[str, Dict[str, int]] = {}
+    for pid in pids:
+        try:
+            report[str(pid)] = process_memory(pid)
+        except OSError:
+            continue
+    total: Dict[str, int] = {}
+    for memory in report.values():
+        for name, value in memory.items():
+            total[name] = total.get(name, 0) + value
+    report["total"] = total
+    return report
+
+
+def configure_shared_state(workers: int) -> None:
+    """
+    Point per-process state at shared backends, unless configured explicitly.
+    Must run before the app is imported, since the settings are read at import time.
+    """
+    if workers <= 1:
+        return
+    # The backend package imports its submodules lazily, so nothing has read these yet
+    # unless a caller imported backend modules before this call
+    too_late = [name for name in ("backend.translation", "backend.stt", "backend.jobs") if name in sys.modules]
+    if too_late:
+        raise RuntimeError(f"configure_shared_state() must run before importing {', '.join(too_late)}")
+    os.makedirs(SHARED_STATE_DIR, exist_ok=True)
+    defaults = {
+        "RATE_LIMIT_STORAGE_URI": "sqlite://" + os.path.join(SHARED_STATE_DIR, "rate_limits.sqlite"),
+        "TRANSLATION_CACHE_PATH": os.path.join(SHARED_STATE_DIR, "translations.sqlite"),
+        "STT_CACHE_PATH": os.path.join(SHARED_STATE_DIR, "transcripts.sqlite"),
+        "TM_PATH": os.path.join(SHARED_STATE_DIR, "translation_memory.jsonl"),
+        "JOBS_PATH": os.path.join(SHARED_STATE_DIR, "jobs.sqlite"),
+    }
+    for name, value in defaults.items():
+        if not os.getenv(name):
+            os.environ[name] = value
+            logger.info(f"{name}={value}")
+
+
+def preload_models(names: List[str]) -> None:
+    from backend.registry import registry
+
+    for name in names:
+        if name in FORK_UNSAFE_MODELS:
+            logger.warning(f"Not preloading '{name}': it cannot be shared over fork(); each worker loads its own")
+            continue
+        started = time.perf_counter()
+        registry.get(name)
+        logger.info(f"Preloaded '{name}' in {time.perf_counter() - started:.1f}s")
+
+
+class PreforkServer:
+    """Forks uvicorn workers that accept connections on one inherited socket."""
+
+    def __init__(self, app, host: str, port: int, workers: int):
+        import uvicorn
+
+        self.app = app
+        self.workers = max(1, workers)
+        self.config = uvicorn.Config(app, host=host, port=port, log_level="info")
+        self.socket = self.config.bind_socket()
+        self.children: Dict[int, int] = {}  # pid -> worker number
+        self.stopping = False
+
+    def _spawn(self, number: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            import uvicorn
+
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                uvicorn.Server(self.config).run(sockets=[self.socket])
+            except Exception as e:
+                logger.error(f"Worker {number} failed: {str(e)}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = number
+        logger.info(f"Started worker {number} (pid {pid})")
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _log_memory(self) -> None:
+        report = memory_report([os.getpid(), *self.children])
+        for pid, memory in report.items():
+            logger.info(
+                f"memory {pid}: rss={memory.get('rss', 0) / 2**20:.0f}MB pss={memory.get('pss', 0) / 2**20:.0f}MB"
+            )
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for number in range(self.workers):
+            self._spawn(number)
+        logger.info(
+            f"Serving on {self.config.host}:{self.config.port} with {self.workers} workers "
+            f"(parent pid {os.getpid()}; measure with: python -m benchmarks.measure_memory --pid {os.getpid()})"
+        )
+
+        next_memory_log = time.monotonic() + SERVE_MEMORY_LOG_S
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.5)
+                if SERVE_MEMORY_LOG_S and time.monotonic() >= next_memory_log:
+                    self._log_memory()
+                    next_memory_log = time.monotonic() + SERVE_MEMORY_LOG_S
+                continue
+            number = self.children.pop(pid, None)
+            if number is None or self.stopping:
+                continue
+            logger.warning(f"Worker {number} (pid {pid}) exited with status {status}; restarting")
+            time.sleep(1)
+            self._spawn(number)
+        self.socket.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        sys.exit("The pre-fork server needs fork(); use uvicorn directly on this platform")
+
+    configure_shared_state(args.workers)
+    from backend.app import app
+
+    preload_models(PRELOAD_MODELS)
+    PreforkServer(app, args.host, args.port, args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
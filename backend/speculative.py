@@ -0,0 +1,149 @@
+# backend/speculative.py
+import os
+import time
+import threading
+import logging
+from typing import Any, Dict, Optional
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Speculative decoding for the translation model, per deployment:
+#   none           decode one token at a time
+#   prompt_lookup  propose continuations copied from the prompt (drug names,
+#                  dosages and lab values usually reappear verbatim in the output)
+#   draft          propose tokens with a small GGUF model sharing the main model's vocabulary
+SPECULATIVE_MODES = ("none", "prompt_lookup", "draft")
+SPECULATIVE_MODE = os.getenv("SPECULATIVE_MODE", "none")
+# Tokens proposed per verification step
+SPECULATIVE_NUM_PRED_TOKENS = int(os.getenv("SPECULATIVE_NUM_PRED_TOKENS", "10"))
+# Longest n-gram matched against the prompt in prompt_lookup mode
+SPECULATIVE_MAX_NGRAM = int(os.getenv("SPECULATIVE_MAX_NGRAM", "3"))
+# Draft model file for draft mode, e.g. a 1B model of the same family
+DRAFT_MODEL_PATH = os.getenv("DRAFT_MODEL_PATH", "")
+DRAFT_CONTEXT_SIZE = int(os.getenv("DRAFT_CONTEXT_SIZE", "1024"))
+
+
+class GGUFDraftModel:
+    """
+    Proposes tokens by greedy decoding with a small GGUF model.
+
+    Implements llama-cpp-python's LlamaDraftModel interface: called with the
+    token ids so far, returns the proposed next tokens. The draft context
+    keeps its KV cache between calls, so only the tokens accepted since the
+    last call are evaluated again.
+    """
+
+    def __init__(self, model_path: str, num_pred_tokens: int = SPECULATIVE_NUM_PRED_TOKENS, n_threads: int = 4):
+        from llama_cpp import Llama
+
+        self.llm = Llama(
+            model_path=model_path,
+            n_ctx=DRAFT_CONTEXT_SIZE,
+            n_threads=n_threads,
+            use_mmap=True,
+            verbose=False
+        )
+        self.model_path = model_path
+        self.num_pred_tokens = num_pred_tokens
+        logger.info(f"Draft model loaded from {model_path}")
+
+    def check_vocabulary(self, n_vocab: int) -> None:
+        """Proposals are token ids, so the draft and main model must share one tokenizer."""
+        if self.llm.n_vocab() != n_vocab:
+            raise ValueError(
+                f"Draft model {os.path.basename(self.model_path)} has a vocabulary of {self.llm.n_vocab()} "
+                f"tokens, the translation model {n_vocab}"
+            )
+
+    def __call__(self, input_ids: np.ndarray, /, **kwargs: Any) -> np.ndarray:
+        budget = min(self.num_pred_tokens, DRAFT_CONTEXT_SIZE - len(input_ids))
+        draft = []
+        if budget > 0:
+            for token in self.llm.generate(input_ids.tolist(), temp=0.0, top_k=1):
+                if token == self.llm.token_eos():
+                    break
+                draft.append(token)
+                if len(draft) >= budget:
+                    break
+        return np.array(draft, dtype=np.intc)
+
+
+class InstrumentedDraftModel:
+    """
+    Wraps a draft model and measures how many of its proposals are accepted.
+
+    Llama verifies the proposed tokens in one batch and keeps the longest
+    prefix that matches what it samples itself, so the next call's input
+    shows how far the previous proposal got. Proposals still pending when a
+    generation ends are not counted.
+    """
+
+    def __init__(self, draft_model: Any, mode: str):
+        self.draft_model = draft_model
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._pending: Optional[np.ndarray] = None
+        self._pending_at = 0
+        self.calls = 0
+        self.proposed = 0
+        self.accepted = 0
+        self.draft_seconds = 0.0
+
+    def begin(self) -> None:
+        """Forget the pending proposal before a new generation starts."""
+        self._pending = None
+
+    def _settle(self, input_ids: np.ndarray) -> None:
+        if self._pending is None or len(self._pending) == 0 or len(input_ids) <= self._pending_at:
+            return
+        verified = input_ids[self._pending_at:self._pending_at + len(self._pending)]
+        matches = verified == self._pending[:len(verified)]
+        accepted = len(matches) if matches.all() else int(np.argmin(matches))
+        with self._lock:
+            self.proposed += len(self._pending)
+            self.accepted += accepted
+
+    def __call__(self, input_ids: np.ndarray, /, **kwargs: Any) -> np.ndarray:
+        self._settle(input_ids)
+        started = time.perf_counter()
+        draft = self.draft_model(input_ids, **kwargs)
+        with self._lock:
+            self.calls += 1
+            self.draft_seconds += time.perf_counter() - started
+        self._pending = np.array(draft, dtype=np.intc)
+        self._pending_at = len(input_ids)
+        return draft
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "draft_calls": self.calls,
+                "proposed_tokens": self.proposed,
+                "accepted_tokens": self.accepted,
+                "acceptance_rate": round(self.accepted / self.proposed, 4) if self.proposed else 0.0,
+                "draft_ms": round(1000 * self.draft_seconds, 2),
+            }
+
+
+def build_draft_model(mode: str, n_threads: int = 4,
+                      draft_model_path: str = DRAFT_MODEL_PATH) -> Optional[InstrumentedDraftModel]:
+    """Create the instrumented draft model for a speculative mode, or None for plain decoding."""
+    if mode not in SPECULATIVE_MODES:
+        raise ValueError(f"Unknown speculative mode '{mode}'. Available modes: {', '.join(SPECULATIVE_MODES)}")
+    if mode == "none":
+        return None
+    if mode == "prompt_lookup":
+        from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+
+        draft_model = LlamaPromptLookupDecoding(
+            max_ngram_size=SPECULATIVE_MAX_NGRAM,
+            num_pred_tokens=SPECULATIVE_NUM_PRED_TOKENS
+        )
+    else:
+        if not draft_model_path:
+            raise ValueError("SPECULATIVE_MODE=draft needs DRAFT_MODEL_PATH")
+        draft_model = GGUFDraftModel(draft_model_path, n_threads=n_threads)
+    return InstrumentedDraftModel(draft_model, mode)
@@ -0,0 +1,189 @@
+# backend/streaming_stt.py
+import os
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from backend.stt import transcribe_samples, translate_result, SAMPLE_RATE
+from backend.executor import get_pool, QueueFullError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Voice activity detection settings for live transcription
+STREAM_FRAME_MS = 30
+STREAM_VAD_THRESHOLD = float(os.getenv("STREAM_VAD_THRESHOLD", "0.01"))  # frame RMS, full scale = 1.0
+STREAM_MIN_SILENCE_MS = int(os.getenv("STREAM_MIN_SILENCE_MS", "600"))
+STREAM_MIN_SPEECH_MS = int(os.getenv("STREAM_MIN_SPEECH_MS", "250"))
+STREAM_MAX_UTTERANCE_S = float(os.getenv("STREAM_MAX_UTTERANCE_S", "20"))
+STREAM_PRE_ROLL_MS = 300
+# How much an open utterance must grow before a new partial transcript is produced (0 disables)
+STREAM_PARTIAL_INTERVAL_S = float(os.getenv("STREAM_PARTIAL_INTERVAL_S", "1.5"))
+
+Utterance = Tuple[float, np.ndarray]  # (start time in seconds, samples)
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit PCM bytes to float32 samples in [-1, 1]."""
+    usable = len(data) - len(data) % 2
+    return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+class UtteranceSegmenter:
+    """
+    Energy-based voice activity detector that cuts a live stream into utterances.
+
+    Samples are processed in fixed frames. An utterance opens on the first
+    voiced frame (keeping a short pre-roll) and closes after enough trailing
+    silence or when it reaches the maximum length.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = STREAM_FRAME_MS,
+        threshold: float = STREAM_VAD_THRESHOLD,
+        min_silence_ms: int = STREAM_MIN_SILENCE_MS,
+        min_speech_ms: int = STREAM_MIN_SPEECH_MS,
+        max_utterance_s: float = STREAM_MAX_UTTERANCE_S,
+        pre_roll_ms: int = STREAM_PRE_ROLL_MS
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.threshold = threshold
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_frames = max(1, int(max_utterance_s * 1000 / frame_ms))
+        self._pre_roll: Deque[np.ndarray] = deque(maxlen=max(0, pre_roll_ms // frame_ms))
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._frames: List[np.ndarray] = []
+        self._in_speech = False
+        self._silent_frames = 0
+        self._voiced_frames = 0
+        self._position = 0  # samples consumed so far
+        self._utterance_start = 0
+
+    def feed(self, samples: np.ndarray) -> List[Utterance]:
+        """Add samples and return every utterance closed by them."""
+        closed = []
+        self._pending = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        n_frames = len(self._pending) // self.frame_size
+        for i in range(n_frames):
+            frame = self._pending[i * self.frame_size:(i + 1) * self.frame_size]
+            voiced = float(np.sqrt(np.mean(frame * frame))) >= self.threshold
+            if not self._in_speech:
+                if voiced:
+                    self._in_speech = True
+                    self._frames = list(self._pre_roll) + [frame]
+                    self._utterance_start = self._position - len(self._pre_roll) * self.frame_size
+                    self._pre_roll.clear()
+                    self._silent_frames = 0
+                    self._voiced_frames = 1
+                else:
+                    self._pre_roll.append(frame)
+            else:
+                self._frames.append(frame)
+                if voiced:
+                    self._silent_frames = 0
+                    self._voiced_frames += 1
+                else:
+                    self._silent_frames += 1
+                if self._silent_frames >= self.min_silence_frames or len(self._frames) >= self.max_frames:
+                    utterance = self._close()
+                    if utterance is not None:
+                        closed.append(utterance)
+            self._position += self.frame_size
+        self._pending = self._pending[n_frames * self.frame_size:]
+        return closed
+
+    def flush(self) -> List[Utterance]:
+        """Close the open utterance, e.g. when the client stops streaming."""
+        if self._in_speech and len(self._pending):
+            self._frames.append(self._pending)
+        self._pending = np.zeros(0, dtype=np.float32)
+        if not self._in_speech:
+            return []
+        utterance = self._close()
+        return [utterance] if utterance is not None else []
+
+    def current(self) -> Optional[Utterance]:
+        """Return the utterance that is still open, if any."""
+        if not self._in_speech:
+            return None
+        return self._utterance_start / self.sample_rate, np.concatenate(self._frames)
+
+    def _close(self) -> Optional[Utterance]:
+        utterance = None
+        if self._voiced_frames >= self.min_speech_frames:
+            utterance = (self._utterance_start / self.sample_rate, np.concatenate(self._frames))
+        self._in_speech = False
+        self._frames = []
+        self._silent_frames = 0
+        self._voiced_frames = 0
+        return utterance
+
+
+class StreamingTranscriber:
+    """
+    One live transcription session.
+
+    Feed it raw 16 kHz mono PCM16 audio; it returns transcript events:
+    `partial` events for the utterance still being spoken and a `final`
+    event, translated to the output language, for every closed utterance.
+    """
+
+    def __init__(self, input_language: str = "en", output_language: str = "en"):
+        self.input_language = input_language
+        self.output_language = output_language
+        self.segmenter = UtteranceSegmenter()
+        self._partial_samples = 0
+
+    async def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        events = []
+        for utterance in self.segmenter.feed(pcm16_to_float32(data)):
+            events.append(await self._final(utterance))
+        partial = await self._partial()
+        if partial is not None:
+            events.append(partial)
+        return events
+
+    async def finish(self) -> List[Dict[str, Any]]:
+        return [await self._final(utterance) for utterance in self.segmenter.flush()]
+
+    async def _partial(self) -> Optional[Dict[str, Any]]:
+        current = self.segmenter.current()
+        if current is None or STREAM_PARTIAL_INTERVAL_S <= 0:
+            return None
+        start, audio = current
+        if len(audio) - self._partial_samples < STREAM_PARTIAL_INTERVAL_S * SAMPLE_RATE:
+            return None
+        self._partial_samples = len(audio)
+        try:
+            # Partials are only a preview, so they skip translation
+            result = await get_pool("whisper").run(
+                transcribe_samples, audio, self.input_language, start
+            )
+        except QueueFullError:
+            return None  # drop the preview rather than fall behind
+        return {
+            "type": "partial",
+            "text": result["original_text"],
+            "start": start,
+            "end": start + len(audio) / SAMPLE_RATE
+        }
+
+    async def _final(self, utterance: Utterance) -> Dict[str, Any]:
+        start, audio = utterance
+        self._partial_samples = 0
+        result = await get_pool("whisper").run(transcribe_samples, audio, self.input_language, start)
+        if self.output_language != self.input_language:
+            result = await get_pool("llm").run(
+                translate_result, result, self.input_language, self.output_language
+            )
+        return {
+            "type": "final",
+            "start": start,
+            "end": start + len(audio) / SAMPLE_RATE,
+            **result
+        }
@@ -1,58 +1,205 @@
 # backend/stt.py
-from faster_whisper import WhisperModel
-import tempfile
-import os
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 import logging
-from googletrans import Translator
-import soundfile as sf
+import numpy as np
 import io
+import os
+import time
+import hashlib
+from backend.registry import registry
+from backend.cache import build_cache
+from backend.metrics import metrics, stage, record_stage, record_whisper
+from backend.translation_engine import translate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Set up custom temp directory
-TEMP_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "temp")
-os.makedirs(TEMP_DIR, exist_ok=True)  # Fixed: Changed 'exist' to 'exist_ok'
-tempfile.tempdir = TEMP_DIR
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# CTranslate2 threads for the shared Whisper model
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", str(os.cpu_count() or 4)))
+# Recordings at least this long are split on speech boundaries and transcribed in batches
+LONG_AUDIO_MIN_S = float(os.getenv("LONG_AUDIO_MIN_S", "120"))
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+
+# Transcripts are cached by a hash of the audio bytes and the spoken language
+STT_CACHE_SIZE = int(os.getenv("STT_CACHE_SIZE", "1000"))
+STT_CACHE_TTL = float(os.getenv("STT_CACHE_TTL", "86400"))
+STT_CACHE_PATH = os.getenv("STT_CACHE_PATH", "")
+
+# Clips with less voiced audio than this (30 ms frames above the RMS threshold) are rejected
+STT_SILENCE_THRESHOLD = float(os.getenv("STT_SILENCE_THRESHOLD", "0.01"))
+STT_MIN_SPEECH_MS = int(os.getenv("STT_MIN_SPEECH_MS", "250"))
+VAD_FRAME_MS = 30
+
+WHISPER_MODEL_SIZE = "base"
+
+stt_cache = build_cache(STT_CACHE_SIZE, STT_CACHE_TTL, STT_CACHE_PATH or None)
+
+stt_rejections = metrics.counter(
+    "stt_rejections_total", "Recordings rejected before transcription.", ["reason"])
+
+
+class SilentAudioError(ValueError):
+    """Raised when a recording contains no speech worth transcribing."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _load_whisper():
+    from faster_whisper import WhisperModel
+    return WhisperModel(WHISPER_MODEL_SIZE, device="cpu", compute_type="int8", cpu_threads=WHISPER_CPU_THREADS)
+
+def _load_batched_whisper():
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        logger.warning("faster-whisper has no BatchedInferencePipeline; long recordings are transcribed sequentially")
+        return None
+    return BatchedInferencePipeline(model=registry.get("whisper"))
+
+# The Whisper model is loaded on first use or by the startup warm-up
+registry.register("whisper", _load_whisper)
+# The batched pipeline shares the Whisper model and is created on the first long recording
+registry.register("whisper_batched", _load_batched_whisper)
+
+def get_model():
+    """Return the Whisper model, loading it if needed."""
+    return registry.get("whisper")
+
+def decode_audio_bytes(audio_bytes: bytes) -> np.ndarray:
+    """
+    Decode an in-memory wav/mp3/ogg recording to a 16 kHz mono float32 array.
+    """
+    from faster_whisper import decode_audio
+    with stage("decode"):
+        return decode_audio(io.BytesIO(audio_bytes), sampling_rate=SAMPLE_RATE)
+
+def voiced_seconds(audio: np.ndarray, threshold: float = STT_SILENCE_THRESHOLD) -> float:
+    """Total duration of the frames whose RMS energy reaches the threshold."""
+    frame_size = SAMPLE_RATE * VAD_FRAME_MS // 1000
+    n_frames = len(audio) // frame_size
+    if n_frames == 0:
+        return 0.0
+    frames = audio[:n_frames * frame_size].reshape(n_frames, frame_size)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return int(np.count_nonzero(rms >= threshold)) * VAD_FRAME_MS / 1000
 
-# Initialize the Whisper model
-model = WhisperModel("base", device="cpu", compute_type="int8")
+def check_speech(audio: np.ndarray) -> None:
+    """
+    Reject empty and silent recordings before they reach the model.
+    Raises SilentAudioError.
+    """
+    if len(audio) == 0:
+        stt_rejections.inc(reason="empty")
+        raise SilentAudioError("empty", "The recording contains no audio")
+    if voiced_seconds(audio) * 1000 < STT_MIN_SPEECH_MS:
+        stt_rejections.inc(reason="silent")
+        raise SilentAudioError("silent", "No speech detected in the recording")
+
+def stt_cache_key(audio_bytes: bytes, input_language: str) -> str:
+    """Hash of the audio content, the spoken language and the Whisper model."""
+    digest = hashlib.sha256(audio_bytes).hexdigest()
+    return f"{WHISPER_MODEL_SIZE}:{input_language}:{digest}"
 
-def transcribe_audio(audio_bytes: bytes, input_language: str = "en", output_language: str = "en") -> Dict[str, Any]:
+def translate_transcript(text: str, input_language: str, output_language: str) -> str:
+    """Translate a transcript into the output language if it differs from the input."""
+    if input_language == output_language or not text.strip():
+        return text
+    return translate(text, source_lang=input_language, target_lang=output_language)["translated_text"]
+
+def translate_result(result: Dict[str, Any], input_language: str, output_language: str) -> Dict[str, Any]:
+    """
+    Return a copy of a transcription result with the transcript translated into
+    the output language. Meant for the LLM pool, after the Whisper stage.
     """
-    Transcribe audio using Faster-Whisper model.
+    translated_text = translate_transcript(result["original_text"], input_language, output_language)
+    return {**result, "transcribed_text": translated_text.strip(), "language": output_language}
+
+def transcribe_samples(audio: np.ndarray, input_language: str = "en", offset: float = 0.0) -> Dict[str, Any]:
+    """
+    Transcribe 16 kHz mono float32 samples; translation is left to translate_result.
+    Segment timestamps are shifted by `offset` seconds.
+    """
+    return _transcript(list(iter_segments(audio, input_language)), input_language, offset)
+
+def _transcript(segments: List[Any], input_language: str, offset: float = 0.0) -> Dict[str, Any]:
+    """The transcription result for a list of Whisper segments."""
+    # Combine all segments into a single text
+    original_text = " ".join([segment.text for segment in segments]).strip()
+
+    return {
+        "original_text": original_text,
+        "transcribed_text": original_text,  # Add transcribed_text for frontend compatibility
+        "confidence": sum([segment.avg_logprob for segment in segments]) / max(len(segments), 1),
+        "language": input_language,
+        "segments": [{"text": s.text, "start": s.start + offset, "end": s.end + offset} for s in segments]
+    }
+
+def iter_segments(audio: np.ndarray, input_language: str = "en") -> Iterator[Any]:
     """
-    tmp_path = None  # Initialize tmp_path to ensure it exists in the finally block
+    Transcribe 16 kHz mono float32 samples, yielding Whisper segments as they are produced.
+
+    Recordings of LONG_AUDIO_MIN_S or more go through faster-whisper's batched
+    pipeline: the audio is split into chunks on voice-activity boundaries and
+    WHISPER_BATCH_SIZE chunks are decoded together, with timestamps relative
+    to the start of the recording.
+    """
+    duration = len(audio) / SAMPLE_RATE
+    batched = registry.get("whisper_batched") if duration >= LONG_AUDIO_MIN_S else None
+    started = time.perf_counter()
     try:
-        # Save the raw audio to a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            tmp.write(audio_bytes)
-            tmp_path = tmp.name  # Assign the temporary file path
-
-        # Transcribe the audio file
-        segments, info = model.transcribe(tmp_path, language=input_language)
-        segments = list(segments)
-
-        # Combine all segments into a single text
-        original_text = " ".join([segment.text for segment in segments])
-
-        # Translate the text if needed
-        translated_text = original_text
-        if input_language != output_language:
-            translator = Translator()
-            translated = translator.translate(original_text, src=input_language, dest=output_language)
-            translated_text = translated.text
-
-        return {
-            "original_text": original_text.strip(),
-            "transcribed_text": translated_text.strip(),  # Add transcribed_text for frontend compatibility
-            "confidence": sum([segment.avg_logprob for segment in segments]) / max(len(segments), 1),
-            "language": output_language,
-            "segments": [{"text": s.text, "start": s.start, "end": s.end} for s in segments]
-        }
+        if batched is not None:
+            segments, info = batched.transcribe(audio, language=input_language, batch_size=WHISPER_BATCH_SIZE)
+        else:
+            segments, info = get_model().transcribe(audio, language=input_language)
+        yield from segments
+        record_whisper(duration, time.perf_counter() - started)
     finally:
-        # Ensure the temporary file is deleted if it was created
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        record_stage("asr", time.perf_counter() - started)
+
+def iter_transcript_segments(audio_bytes: bytes, input_language: str = "en") -> Iterator[Dict[str, Any]]:
+    """
+    Decode and transcribe a recording, yielding each segment as soon as Whisper produces it.
+    Once every segment has been produced the transcript is cached like a /stt result.
+    """
+    audio = decode_audio_bytes(audio_bytes)
+    check_speech(audio)
+    segments = []
+    for segment in iter_segments(audio, input_language):
+        segments.append(segment)
+        yield {"text": segment.text.strip(), "start": segment.start, "end": segment.end}
+    stt_cache.set(stt_cache_key(audio_bytes, input_language), _transcript(segments, input_language))
+
+def cached_segments(audio_bytes: bytes, input_language: str = "en") -> Optional[List[Dict[str, Any]]]:
+    """The segments of a cached transcript of this recording, as iter_transcript_segments yields them."""
+    cached = stt_cache.get(stt_cache_key(audio_bytes, input_language))
+    if cached is None:
+        return None
+    return [{"text": s["text"].strip(), "start": s["start"], "end": s["end"]} for s in cached["segments"]]
+
+def transcribe_audio(audio_bytes: bytes, input_language: str = "en") -> Dict[str, Any]:
+    """
+    Transcribe audio using Faster-Whisper model, without translating it.
+    Identical recordings are answered from the cache; silent ones raise SilentAudioError.
+    """
+    key = stt_cache_key(audio_bytes, input_language)
+    cached = stt_cache.get(key)
+    if cached is not None:
+        return {**cached, "cached": True}
+    try:
+        # Decode straight from memory; no temporary file round trip
+        audio = decode_audio_bytes(audio_bytes)
+        check_speech(audio)
+        result = transcribe_samples(audio, input_language)
+        stt_cache.set(key, result)
+        return result
+    except SilentAudioError:
+        raise
+    except Exception as e:
+        logger.error(f"Transcription failed: {str(e)}")
+        raise
@@ -0,0 +1,61 @@
+# backend/text_utils.py
+import re
+from typing import Callable, List, Tuple
+
+# Shared by translation (chunks sized in model tokens) and speech synthesis
+# (one sentence per worker)
+
+# Paragraph breaks, or whitespace following sentence-ending punctuation
+_CHUNK_BOUNDARY = re.compile(r"(\n\s*\n|(?<=[.!?;。！？])\s+)")
+
+
+def _longest_fit(text: str, max_length: int, length: Callable[[str], int]) -> int:
+    """Largest n such that length(text[:n]) <= max_length, found by bisection."""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if length(text[:middle]) <= max_length:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _split_long_sentence(sentence: str, max_length: int, length: Callable[[str], int]) -> List[Tuple[str, str]]:
+    """Split a sentence that is still too long at the last space before the limit."""
+    pieces = []
+    while length(sentence) > max_length:
+        fit = max(_longest_fit(sentence, max_length, length), 1)
+        cut = sentence.rfind(" ", 0, fit)
+        if cut <= 0:
+            # No space to break at, as in Chinese, Japanese or Thai text
+            cut = fit
+        pieces.append((sentence[:cut], " " if sentence[cut:cut + 1] == " " else ""))
+        sentence = sentence[cut:].lstrip(" ")
+    pieces.append((sentence, ""))
+    return pieces
+
+
+def split_into_chunks(
+    text: str,
+    max_length: int = 500,
+    length: Callable[[str], int] = len
+) -> List[Tuple[str, str]]:
+    """
+    Split text into sentence-sized chunks.
+
+    Sentences longer than `max_length`, as measured by `length` (characters
+    by default), are split further.
+
+    Returns:
+        List[Tuple[str, str]]: (chunk, separator) pairs; joining every chunk
+        followed by its separator reproduces the original text.
+    """
+    parts = _CHUNK_BOUNDARY.split(text)
+    chunks: List[Tuple[str, str]] = []
+    for i in range(0, len(parts), 2):
+        separator = parts[i + 1] if i + 1 < len(parts) else ""
+        pieces = _split_long_sentence(parts[i], max_length, length)
+        pieces[-1] = (pieces[-1][0], separator)
+        chunks.extend(pieces)
+    return chunks
@@ -1,7 +1,20 @@
 import os
-from typing import Dict, Any
-from llama_cpp import Llama
+import time
+import ctypes
+import hashlib
+import threading
+import unicodedata
+from concurrent.futures import Future
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import logging
+from backend.batching import TranslationScheduler
+from backend.batched_decoding import BatchedDecoder, Sequence
+from backend.cache import build_cache, LRUCache
+from backend.registry import registry
+from backend.metrics import record_llama_generation
+from backend.translation_memory import translation_memory
+from backend.speculative import build_draft_model, GGUFDraftModel, SPECULATIVE_MODE
+from backend.text_utils import split_into_chunks
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +39,40 @@ MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "MMed-Llama-3-8B.
 DEFAULT_CONTEXT_SIZE = 512
 DEFAULT_THREADS = 4
 
+# Number of llama contexts decoding in parallel; each one holds its own KV cache
+LLAMA_CONTEXTS = int(os.getenv("LLAMA_CONTEXTS", "1"))
+LLAMA_THREADS = int(os.getenv("LLAMA_THREADS", str(DEFAULT_THREADS)))
+# Requests decoded together as sequences of one batched context (1 = one per context),
+# and how long an idle context waits for a batch to fill
+TRANSLATION_MAX_BATCH = int(os.getenv("TRANSLATION_MAX_BATCH", "4"))
+TRANSLATION_MAX_WAIT_MS = float(os.getenv("TRANSLATION_MAX_WAIT_MS", "10"))
+# Lock the mapped weights in RAM so they are never paged out under memory pressure
+LLAMA_MLOCK = os.getenv("LLAMA_MLOCK", "0").lower() in ("1", "true", "yes")
+
+# Translation result cache: in-memory LRU entries, TTL in seconds (0 = no expiry)
+# and an optional SQLite file that survives restarts
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "10000"))
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", "86400"))
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", "")
+
+# Upper bound on the tokens of the prompt template around the text, for any language pair
+PROMPT_TEMPLATE_TOKENS = 80
+# Output tokens reserved per source token: translations into scripts such as
+# Chinese, Japanese or Thai can take more tokens than the source text
+TRANSLATION_OUTPUT_RATIO = float(os.getenv("TRANSLATION_OUTPUT_RATIO", "1.5"))
+# Texts longer than this many model tokens are split at paragraph/sentence
+# boundaries and the chunks are translated independently, so that the prompt,
+# the chunk and its translation fit in n_ctx
+TRANSLATION_CHUNK_TOKENS = int(os.getenv(
+    "TRANSLATION_CHUNK_TOKENS",
+    str(int((DEFAULT_CONTEXT_SIZE - PROMPT_TEMPLATE_TOKENS) / (1 + TRANSLATION_OUTPUT_RATIO)))
+))
+
+# Number of (source, target) prompt-prefix KV snapshots kept per context (0 disables)
+PREFIX_CACHE_SIZE = int(os.getenv("PREFIX_CACHE_SIZE", "4"))
+# Memory the prompt-prefix snapshots of one context may use, in megabytes
+PREFIX_CACHE_MAX_MB = int(os.getenv("PREFIX_CACHE_MAX_MB", "64"))
+
 # Enhanced prompt template for medical translation
 PREPROMPT_TEMPLATE = """
 You are a specialized medical translation assistant. Translate the following medical text from {source_lang_name} to {target_lang_name}.
@@ -37,27 +84,225 @@ Original Text:
 Translation:
 """
 
+# Prompt for source_lang "auto": the model works out the source language itself
+AUTO_SOURCE_PREPROMPT_TEMPLATE = """
+You are a specialized medical translation assistant. Translate the following medical text to {target_lang_name}.
+If the text is already in {target_lang_name}, return it unchanged.
+Return only the translated text without any additional information or repetition.
+
+Original Text:
+{text}
+
+Translation:
+"""
+
+# The instruction block before {text} only depends on the language pair
+PREFIX_TEMPLATE, SUFFIX_TEMPLATE = PREPROMPT_TEMPLATE.split("{text}")
+AUTO_PREFIX_TEMPLATE, AUTO_SUFFIX_TEMPLATE = AUTO_SOURCE_PREPROMPT_TEMPLATE.split("{text}")
+
 class MedicalTranslator:
-    def __init__(self, model_path: str = MODEL_PATH):
+    def __init__(self, model_path: str = MODEL_PATH, n_threads: int = DEFAULT_THREADS,
+                 speculative_mode: str = SPECULATIVE_MODE):
         """Initialize the medical translator with the specified model."""
         try:
+            from llama_cpp import Llama
+            # Proposes tokens that the model verifies in one batch instead of one at a time
+            self.speculative = build_draft_model(speculative_mode, n_threads=n_threads)
+            # The weights are memory-mapped from the GGUF file, so every process
+            # serving the same file shares one copy through the page cache
             self.llm = Llama(
                 model_path=model_path,
                 n_ctx=DEFAULT_CONTEXT_SIZE,
-                n_threads=DEFAULT_THREADS
+                n_threads=n_threads,
+                use_mmap=True,
+                use_mlock=LLAMA_MLOCK,
+                draft_model=self.speculative,
+                # Verifying proposals needs the logits of every position
+                logits_all=self.speculative is not None
             )
-            logger.info(f"Model loaded successfully from {model_path}")
+            if self.speculative is not None and isinstance(self.speculative.draft_model, GGUFDraftModel):
+                self.speculative.draft_model.check_vocabulary(self.llm.n_vocab())
+            logger.info(f"Model loaded successfully from {model_path} (speculative decoding: {speculative_mode})")
         except Exception as e:
             logger.error(f"Failed to load model: {str(e)}")
             raise
 
+        # KV-cache snapshots of the evaluated prompt prefix, per language pair
+        self.prefix_cache = LRUCache(
+            max_entries=PREFIX_CACHE_SIZE,
+            max_bytes=PREFIX_CACHE_MAX_MB * 1024 * 1024
+        ) if PREFIX_CACHE_SIZE > 0 and PREFIX_CACHE_MAX_MB > 0 else None
+        self.prefix_tokens_saved = 0
+        self.speculative_mode = speculative_mode
+        self.n_threads = n_threads
+        self.generated_tokens = 0
+        self.generation_seconds = 0.0
+
+    def _save_sequence(self) -> bytes:
+        """Copy the KV cache of sequence 0, without the logits and RNG state of a full LlamaState."""
+        import llama_cpp
+
+        size = llama_cpp.llama_state_seq_get_size(self.llm.ctx, 0)
+        buffer = (ctypes.c_uint8 * size)()
+        written = llama_cpp.llama_state_seq_get_data(self.llm.ctx, buffer, size, 0)
+        return bytes(buffer[:written])
+
+    def _load_sequence(self, data: bytes, tokens: List[int]) -> bool:
+        """Put a sequence saved by `_save_sequence` back into an empty KV cache."""
+        import llama_cpp
+
+        self.llm.reset()
+        self.llm._ctx.kv_cache_clear()
+        buffer = (ctypes.c_uint8 * len(data)).from_buffer_copy(data)
+        if not llama_cpp.llama_state_seq_set_data(self.llm.ctx, buffer, len(data), 0):
+            return False
+        # Llama compares the prompt with these ids and only evaluates what follows them
+        self.llm.input_ids[:len(tokens)] = tokens
+        self.llm.n_tokens = len(tokens)
+        return True
+
+    def _restore_prefix(self, prefix: str, source_lang: str, target_lang: str) -> None:
+        """
+        Put the evaluated prompt prefix for this language pair into the context.
+
+        The first call for a pair evaluates the prefix and snapshots its KV
+        cache; later calls load the snapshot. Llama only re-evaluates the
+        tokens after the longest common prefix, so just the user text is processed.
+        """
+        if self.prefix_cache is None:
+            return
+        key = f"{source_lang}->{target_lang}"
+        entry = self.prefix_cache.get(key)
+        if entry is not None:
+            data, tokens = entry
+            if self._load_sequence(data, tokens):
+                self.prefix_tokens_saved += len(tokens)
+                return
+            logger.error(f"Failed to load the prompt prefix snapshot for {key}")
+
+        tokens = self.llm.tokenize(prefix.encode("utf-8"))
+        self.llm.reset()
+        self.llm.eval(tokens)
+        data = self._save_sequence()
+        if len(data) > self.prefix_cache.max_bytes:
+            logger.warning(f"Prompt prefix snapshot for {key} is {len(data) // (1024 * 1024)} MB, over PREFIX_CACHE_MAX_MB")
+        self.prefix_cache.set(key, (data, tokens), size=len(data))
+
+    def prefix_stats(self) -> Dict[str, Any]:
+        """Return prefix snapshot counters for this context."""
+        if self.prefix_cache is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "prompt_tokens_saved": self.prefix_tokens_saved,
+            **self.prefix_cache.stats()
+        }
+
+    def _record_generation(self, prompt_tokens: int, completion_tokens: int, seconds: float) -> None:
+        self.generated_tokens += completion_tokens
+        self.generation_seconds += seconds
+        record_llama_generation(prompt_tokens, completion_tokens, seconds)
+
+    def decoding_stats(self) -> Dict[str, Any]:
+        """Return generation speed and, with speculative decoding, the draft acceptance for this context."""
+        stats = {
+            "mode": self.speculative_mode,
+            "generated_tokens": self.generated_tokens,
+            "generation_seconds": round(self.generation_seconds, 3),
+            "tokens_per_second": (
+                round(self.generated_tokens / self.generation_seconds, 2) if self.generation_seconds else 0.0
+            )
+        }
+        if self.speculative is not None:
+            stats.update(self.speculative.stats())
+        return stats
+
+    def count_tokens(self, text: str) -> int:
+        """Number of model tokens in text, without the BOS token."""
+        return len(self.llm.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def _validate_languages(self, source_lang: str, target_lang: str) -> None:
+        if source_lang != "auto" and source_lang not in SUPPORTED_LANGUAGES:
+            raise ValueError(f"Source language '{source_lang}' not supported")
+        if target_lang not in SUPPORTED_LANGUAGES:
+            raise ValueError(f"Target language '{target_lang}' not supported")
+
+    def _build_prompt(self, text: str, source_lang: str, target_lang: str) -> Tuple[str, str]:
+        """Return the instruction prefix for the language pair and the full prompt."""
+        lang_names = {
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "source_lang_name": SUPPORTED_LANGUAGES.get(source_lang, source_lang),
+            "target_lang_name": SUPPORTED_LANGUAGES[target_lang]
+        }
+        if source_lang == "auto":
+            prefix_template, suffix_template = AUTO_PREFIX_TEMPLATE, AUTO_SUFFIX_TEMPLATE
+        else:
+            prefix_template, suffix_template = PREFIX_TEMPLATE, SUFFIX_TEMPLATE
+        prefix = prefix_template.format(**lang_names)
+        return prefix, prefix + text + suffix_template.format(**lang_names)
+
+    def _prepare(self, text: str, source_lang: str, target_lang: str) -> Tuple[str, int]:
+        """
+        Build the prompt, load the cached prefix state and size the output budget.
+
+        Returns:
+            Tuple[str, int]: The full prompt and the max_tokens left for the output
+        """
+        prefix, prompt = self._build_prompt(text, source_lang, target_lang)
+
+        # Leave whatever the prompt does not use of the context for the output
+        prompt_tokens = len(self.llm.tokenize(prompt.encode("utf-8")))
+        max_tokens = DEFAULT_CONTEXT_SIZE - prompt_tokens
+        if max_tokens <= 0:
+            raise ValueError(
+                f"Text is too long to translate in one pass ({prompt_tokens} prompt tokens, "
+                f"context size {DEFAULT_CONTEXT_SIZE})"
+            )
+
+        # Reuse the already evaluated instruction block for this language pair
+        self._restore_prefix(prefix, source_lang, target_lang)
+        if self.speculative is not None:
+            self.speculative.begin()
+        return prompt, max_tokens
+
+    def create_batched_decoder(self, max_sequences: int) -> BatchedDecoder:
+        """A multi-sequence context over this translator's weights, for batched translation."""
+        return BatchedDecoder(self.llm, max_sequences, DEFAULT_CONTEXT_SIZE, self.n_threads)
+
+    def prepare_sequence(self, text: str, source_lang: str, target_lang: str, payload: Any = None) -> Sequence:
+        """Tokenize the prompt for a translation decoded by a BatchedDecoder."""
+        self._validate_languages(source_lang, target_lang)
+        _, prompt = self._build_prompt(text, source_lang, target_lang)
+        tokens = self.llm.tokenize(prompt.encode("utf-8"))
+        max_tokens = DEFAULT_CONTEXT_SIZE - len(tokens)
+        if max_tokens <= 0:
+            raise ValueError(
+                f"Text is too long to translate in one pass ({len(tokens)} prompt tokens, "
+                f"context size {DEFAULT_CONTEXT_SIZE})"
+            )
+        return Sequence(tokens, max_tokens, stop=b"\n\n", payload=payload)
+
+    def finish_sequence(self, sequence: Sequence, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        """Build the translate_text result for a sequence finished by a BatchedDecoder."""
+        self._record_generation(
+            len(sequence.tokens), len(sequence.generated), sequence.finished - sequence.started
+        )
+        return {
+            "translated_text": clean_translation(sequence.output()),
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "confidence": 0.0,
+            "model_used": os.path.basename(MODEL_PATH)
+        }
+
     def translate_text(self, text: str, source_lang: str = "en", target_lang: str = "es") -> Dict[str, Any]:
         """
         Translate medical text between supported languages.
         
         Args:
             text (str): The medical text to translate
-            source_lang (str): Source language code (e.g., 'en', 'es')
+            source_lang (str): Source language code (e.g., 'en', 'es'), or 'auto'
             target_lang (str): Target language code (e.g., 'en', 'es')
             
         Returns:
@@ -65,10 +310,7 @@ class MedicalTranslator:
         """
         try:
             # Validate languages
-            if source_lang not in SUPPORTED_LANGUAGES:
-                raise ValueError(f"Source language '{source_lang}' not supported")
-            if target_lang not in SUPPORTED_LANGUAGES:
-                raise ValueError(f"Target language '{target_lang}' not supported")
+            self._validate_languages(source_lang, target_lang)
 
             # Skip translation if languages are the same
             if source_lang == target_lang:
@@ -80,35 +322,26 @@ class MedicalTranslator:
                 }
 
             # Prepare the prompt
-            prompt = PREPROMPT_TEMPLATE.format(
-                text=text,
-                source_lang=source_lang,
-                target_lang=target_lang,
-                source_lang_name=SUPPORTED_LANGUAGES[source_lang],
-                target_lang_name=SUPPORTED_LANGUAGES[target_lang]
-            )
+            prompt, max_tokens = self._prepare(text, source_lang, target_lang)
 
             # Generate translation
+            started = time.perf_counter()
             response = self.llm(
                 prompt=prompt,
-                max_tokens=DEFAULT_CONTEXT_SIZE,
+                max_tokens=max_tokens,
                 stop=["\n\n"],
                 temperature=0.3,  # Lower temperature for more accurate translations
                 top_p=0.95
             )
+            usage = response.get("usage") or {}
+            self._record_generation(
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0),
+                time.perf_counter() - started
+            )
 
             # Extract and clean the translated text
-            translated_text = response["choices"][0]["text"].strip()
-
-            # Post-process the output to remove duplicate sentences
-            sentences = translated_text.split(". ")
-            seen = set()
-            cleaned_sentences = []
-            for sentence in sentences:
-                if sentence not in seen:
-                    cleaned_sentences.append(sentence)
-                    seen.add(sentence)
-            translated_text = ". ".join(cleaned_sentences).strip()
+            translated_text = clean_translation(response["choices"][0]["text"])
 
             # Handle cases where logprobs is None
             confidence = response["choices"][0].get("logprobs", None)
@@ -127,12 +360,342 @@ class MedicalTranslator:
             logger.error(f"Translation error: {str(e)}")
             raise
 
-# Initialize the translator
-translator = MedicalTranslator()
+    def stream_translate(
+        self,
+        text: str,
+        source_lang: str = "en",
+        target_lang: str = "es",
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """
+        Translate medical text, yielding pieces of the output as they are generated.
+        The raw pieces are not cleaned; pass the joined output through clean_translation.
+        Generation stops after the current token once `cancel` is set.
+        """
+        self._validate_languages(source_lang, target_lang)
+        if source_lang == target_lang:
+            yield text
+            return
+
+        prompt, max_tokens = self._prepare(text, source_lang, target_lang)
+        started = time.perf_counter()
+        generated = 0
+        try:
+            for chunk in self.llm(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                stop=["\n\n"],
+                temperature=0.3,
+                top_p=0.95,
+                stream=True
+            ):
+                generated += 1  # every streamed chunk is one sampled token
+                if cancel is not None and cancel.is_set():
+                    break
+                piece = chunk["choices"][0]["text"]
+                if piece:
+                    yield piece
+        finally:
+            self._record_generation(0, generated, time.perf_counter() - started)
+
+def clean_translation(translated_text: str) -> str:
+    """Strip the model output and remove duplicate sentences."""
+    translated_text = translated_text.strip()
+    sentences = translated_text.split(". ")
+    seen = set()
+    cleaned_sentences = []
+    for sentence in sentences:
+        if sentence not in seen:
+            cleaned_sentences.append(sentence)
+            seen.add(sentence)
+    return ". ".join(cleaned_sentences).strip()
+
+def _load_translator() -> TranslationScheduler:
+    """Load the translator contexts and the scheduler in front of them."""
+    translators = [MedicalTranslator(n_threads=LLAMA_THREADS) for _ in range(max(1, LLAMA_CONTEXTS))]
+    # Batched sequences are sampled without the draft model, so speculative decoding keeps one per context
+    max_batch = TRANSLATION_MAX_BATCH if SPECULATIVE_MODE == "none" else 1
+    return TranslationScheduler(translators, max_batch, TRANSLATION_MAX_WAIT_MS / 1000)
+
+# The model is loaded on first use or by the startup warm-up
+registry.register("translator", _load_translator)
+
+def get_scheduler() -> TranslationScheduler:
+    """Return the translation scheduler, loading the model if needed."""
+    return registry.get("translator")
+
+def batching_stats() -> Dict[str, Any]:
+    """Return scheduler counters, or an empty dict while the model is not loaded."""
+    scheduler = registry.peek("translator")
+    return scheduler.stats() if scheduler is not None else {}
+
+def prefix_cache_stats() -> Dict[str, Any]:
+    """Aggregate prompt-prefix snapshot counters over every context."""
+    scheduler = registry.peek("translator")
+    if scheduler is None:
+        return {"enabled": PREFIX_CACHE_SIZE > 0}
+    per_context = [t.prefix_stats() for t in scheduler.translators]
+    if not per_context[0]["enabled"]:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "snapshots": sum(c["size"] for c in per_context),
+        "hits": sum(c["hits"] for c in per_context),
+        "misses": sum(c["misses"] for c in per_context),
+        "evictions": sum(c["evictions"] for c in per_context),
+        "bytes": sum(c["bytes"] for c in per_context),
+        "prompt_tokens_saved": sum(c["prompt_tokens_saved"] for c in per_context)
+    }
+
+def speculative_stats() -> Dict[str, Any]:
+    """Aggregate generation speed and draft acceptance over every context."""
+    scheduler = registry.peek("translator")
+    if scheduler is None:
+        return {"mode": SPECULATIVE_MODE}
+    per_context = [t.decoding_stats() for t in scheduler.translators]
+    generated = sum(c["generated_tokens"] for c in per_context)
+    seconds = sum(c["generation_seconds"] for c in per_context)
+    stats = {
+        "mode": per_context[0]["mode"],
+        "generated_tokens": generated,
+        "tokens_per_second": round(generated / seconds, 2) if seconds else 0.0
+    }
+    if "proposed_tokens" in per_context[0]:
+        proposed = sum(c["proposed_tokens"] for c in per_context)
+        accepted = sum(c["accepted_tokens"] for c in per_context)
+        stats.update({
+            "draft_calls": sum(c["draft_calls"] for c in per_context),
+            "proposed_tokens": proposed,
+            "accepted_tokens": accepted,
+            "acceptance_rate": round(accepted / proposed, 4) if proposed else 0.0,
+            "draft_ms": round(sum(c["draft_ms"] for c in per_context), 2)
+        })
+    return stats
+
+# Cache of finished translations, shared by every context
+translation_cache = build_cache(TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_PATH)
+
+def normalize_text(text: str) -> str:
+    """Normalize unicode and whitespace so trivially different inputs share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def translation_cache_key(text: str, source_lang: str, target_lang: str) -> str:
+    """Build the cache key from the normalized text, language pair and model file."""
+    raw = "\x1f".join([os.path.basename(MODEL_PATH), source_lang, target_lang, normalize_text(text)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def submit_translation(text: str, source_lang: str = "en", target_lang: str = "es") -> Future:
+    """
+    Submit a translation and return a Future with the result.
+    Approved sentences and their near-duplicates are answered from the
+    translation memory, and repeated requests from the cache, without touching
+    the model. The memory is checked first: an approval made through another
+    worker must win over a model translation this worker still has cached.
+    """
+    match = translation_memory.lookup(text, source_lang, target_lang)
+    if match is not None:
+        future: Future = Future()
+        future.set_result({
+            "translated_text": match["translated_text"],
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "confidence": match["similarity"],
+            "model_used": "translation-memory",
+            "tm_match": match["match"]
+        })
+        return future
+
+    key = translation_cache_key(text, source_lang, target_lang)
+    cached = translation_cache.get(key)
+    if cached is not None:
+        future = Future()
+        future.set_result({**cached, "cached": True})
+        return future
+
+    submitted_at = time.perf_counter()
+
+    def _store(done: Future) -> None:
+        if done.exception() is None:
+            translation_memory.record_model_latency(source_lang, target_lang, time.perf_counter() - submitted_at)
+            translation_cache.set(key, dict(done.result()))
+
+    future = get_scheduler().submit(text, source_lang, target_lang)
+    future.add_done_callback(_store)
+    return future
+
+def approve_translation(source_text: str, translated_text: str, source_lang: str, target_lang: str) -> None:
+    """
+    Add a reviewed translation to the translation memory.
+    The exact-match cache entry is replaced so the approved wording is served from now on.
+    """
+    translation_memory.add(source_text, translated_text, source_lang, target_lang)
+    translation_cache.set(translation_cache_key(source_text, source_lang, target_lang), {
+        "translated_text": translated_text,
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "confidence": 1.0,
+        "model_used": "translation-memory",
+        "tm_match": "exact"
+    })
+
+def count_tokens(text: str) -> int:
+    """Number of translation model tokens in text."""
+    return get_scheduler().translators[0].count_tokens(text)
+
+def fits_in_one_chunk(text: str) -> bool:
+    """Whether text is short enough to translate in one pass."""
+    # Every token covers at least one UTF-8 byte, so short texts skip the tokenizer
+    if len(text.encode("utf-8")) <= TRANSLATION_CHUNK_TOKENS:
+        return True
+    return count_tokens(text) <= TRANSLATION_CHUNK_TOKENS
+
+def split_for_translation(text: str) -> List[Tuple[str, str]]:
+    """Split text into chunks of at most TRANSLATION_CHUNK_TOKENS model tokens."""
+    return split_into_chunks(text, TRANSLATION_CHUNK_TOKENS, count_tokens)
+
+def translate_document(text: str, source_lang: str = "en", target_lang: str = "es") -> Dict[str, Any]:
+    """
+    Translate a long document chunk by chunk.
+
+    Every chunk is submitted at once so that chunks decode in parallel across
+    the available contexts, and each chunk is cached on its own: editing one
+    sentence of a long document only re-translates that sentence.
+    """
+    chunks = split_for_translation(text)
+    futures = [
+        submit_translation(chunk, source_lang, target_lang) if chunk.strip() else None
+        for chunk, _ in chunks
+    ]
+
+    translated_parts = []
+    results = []
+    for (chunk, separator), future in zip(chunks, futures):
+        if future is None:
+            translated_parts.append(chunk + separator)
+            continue
+        result = future.result()
+        results.append(result)
+        translated_parts.append(result["translated_text"] + separator)
+
+    return {
+        "translated_text": "".join(translated_parts).strip(),
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "confidence": sum(r["confidence"] for r in results) / max(len(results), 1),
+        "model_used": os.path.basename(MODEL_PATH),
+        "chunks": len(results),
+        "cached_chunks": sum(1 for r in results if r.get("cached"))
+    }
+
+# Time-to-first-token of streamed translations, measured from request arrival
+_stream_lock = threading.Lock()
+_stream_stats = {"streams": 0, "ttft_total": 0.0, "ttft_max": 0.0, "ttft_last": 0.0}
+
+def _record_ttft(ttft: float) -> None:
+    with _stream_lock:
+        _stream_stats["streams"] += 1
+        _stream_stats["ttft_total"] += ttft
+        _stream_stats["ttft_max"] = max(_stream_stats["ttft_max"], ttft)
+        _stream_stats["ttft_last"] = ttft
+
+def streaming_stats() -> Dict[str, Any]:
+    """Return time-to-first-token statistics for streamed translations."""
+    with _stream_lock:
+        streams = _stream_stats["streams"]
+        return {
+            "streams": streams,
+            "avg_ttft_ms": round(1000 * _stream_stats["ttft_total"] / streams, 2) if streams else 0.0,
+            "max_ttft_ms": round(1000 * _stream_stats["ttft_max"], 2),
+            "last_ttft_ms": round(1000 * _stream_stats["ttft_last"], 2),
+        }
+
+def stream_translation(
+    text: str,
+    source_lang: str = "en",
+    target_lang: str = "es",
+    requested_at: Optional[float] = None,
+    cancel: Optional[threading.Event] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Translate text and yield frames as output becomes available.
+
+    Yields {"type": "token"} frames with raw output pieces, then one
+    {"type": "final"} frame with the cleaned translation and timings.
+    Cached chunks are emitted whole; the rest are streamed from a borrowed context.
+    Once `cancel` is set, generation stops after the current token and nothing
+    more is yielded or cached.
+    """
+    started = requested_at if requested_at is not None else time.perf_counter()
+    first_token_at = None
+    chunks = [(text, "")] if fits_in_one_chunk(text) else split_for_translation(text)
+    translated_parts = []
+    cached_chunks = 0
+
+    for chunk, separator in chunks:
+        if cancel is not None and cancel.is_set():
+            return
+        output = chunk
+        key = None
+        if chunk.strip():
+            key = translation_cache_key(chunk, source_lang, target_lang)
+            match = translation_memory.lookup(chunk, source_lang, target_lang)
+            cached = translation_cache.get(key) if match is None else None
+            if match is not None:
+                cached_chunks += 1
+                output = match["translated_text"]
+            elif cached is not None:
+                cached_chunks += 1
+                output = cached["translated_text"]
+            else:
+                output = None
+
+        if output is not None:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            yield {"type": "token", "text": output + separator}
+        else:
+            pieces = []
+            with get_scheduler().checkout() as translator:
+                for piece in translator.stream_translate(chunk, source_lang, target_lang, cancel):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    pieces.append(piece)
+                    yield {"type": "token", "text": piece}
+            if cancel is not None and cancel.is_set():
+                return  # a partial translation must not be cached
+            output = clean_translation("".join(pieces))
+            translation_cache.set(key, {
+                "translated_text": output,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "confidence": 0.0,
+                "model_used": os.path.basename(MODEL_PATH)
+            })
+            if separator:
+                yield {"type": "token", "text": separator}
+        translated_parts.append(output + separator)
+
+    if first_token_at is None:
+        first_token_at = time.perf_counter()
+    ttft = first_token_at - started
+    _record_ttft(ttft)
+    yield {
+        "type": "final",
+        "translated_text": "".join(translated_parts).strip(),
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "model_used": os.path.basename(MODEL_PATH),
+        "chunks": len([c for c, _ in chunks if c.strip()]),
+        "cached_chunks": cached_chunks,
+        "ttft_ms": round(1000 * ttft, 2),
+        "total_ms": round(1000 * (time.perf_counter() - started), 2)
+    }
 
 def translate_text(text: str, source_lang: str = "en", target_lang: str = "es") -> Dict[str, Any]:
     """Wrapper function for the translator to be used by the API."""
-    return translator.translate_text(text, source_lang, target_lang)
+    if source_lang != target_lang and not fits_in_one_chunk(text):
+        return translate_document(text, source_lang, target_lang)
+    return submit_translation(text, source_lang, target_lang).result()
 
 def transcribe_audio(audio_path: str) -> str:
     """
@@ -0,0 +1,241 @@
+# backend/translation_engine.py
+import os
+import time
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from backend.metrics import stage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Backends in order of preference; the first one that supports a request handles it
+# and the next ones are fallbacks. "stub" gives deterministic offline output.
+TRANSLATION_BACKENDS = os.getenv("TRANSLATION_BACKENDS", "llama,google")
+# Let a remote backend (Google) take requests the backends before it failed or
+# could not handle. Off by default so medical text is not sent off the server
+# without consent; a remote backend listed first is always used.
+TRANSLATION_REMOTE_FALLBACK = os.getenv("TRANSLATION_REMOTE_FALLBACK", "0").lower() in ("1", "true", "yes")
+# Reused googletrans clients (each keeps its own HTTP connection pool)
+GOOGLE_TRANSLATE_CLIENTS = int(os.getenv("GOOGLE_TRANSLATE_CLIENTS", "4"))
+
+
+class BackendStats:
+    """Latency and error-rate counters for one backend."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += seconds
+            if not ok:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+                "avg_ms": round(1000 * self.total_seconds / self.calls, 2) if self.calls else 0.0,
+            }
+
+
+class TranslationBackend:
+    """
+    Base class for translation backends.
+
+    translate() returns a dict with at least "translated_text", "source_lang"
+    and "target_lang". Remote backends send the text to a third-party service.
+    """
+
+    name = "base"
+    remote = False
+
+    def __init__(self):
+        self.stats = BackendStats()
+
+    def supports(self, text: str, source_lang: str, target_lang: str) -> bool:
+        return True
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class LlamaBackend(TranslationBackend):
+    """
+    The local MedicalTranslator, behind its cache and scheduler.
+
+    Texts of any length are accepted: long ones are translated chunk by chunk.
+    A source language of "auto" is left for the model to recognize.
+    """
+
+    name = "llama"
+
+    def supports(self, text: str, source_lang: str, target_lang: str) -> bool:
+        from backend.translation import SUPPORTED_LANGUAGES
+        return (
+            (source_lang == "auto" or source_lang in SUPPORTED_LANGUAGES)
+            and target_lang in SUPPORTED_LANGUAGES
+        )
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        from backend.translation import translate_text
+        return translate_text(text, source_lang, target_lang)
+
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate through a small pool of long-lived googletrans clients."""
+
+    name = "google"
+    remote = True
+
+    def __init__(self, clients: int = GOOGLE_TRANSLATE_CLIENTS):
+        super().__init__()
+        self._size = max(1, clients)
+        self._created = 0
+        self._idle: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _client(self) -> Iterator[Any]:
+        try:
+            client = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    from googletrans import Translator
+                    client = Translator()
+                except Exception:
+                    # Give the slot back so a later call can try again
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                client = self._idle.get()
+        try:
+            yield client
+        finally:
+            self._idle.put(client)
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        with self._client() as client:
+            translated = client.translate(text, src=source_lang, dest=target_lang)
+        return {
+            "translated_text": translated.text,
+            "source_lang": translated.src,
+            "target_lang": target_lang,
+            "confidence": 0.0
+        }
+
+
+class StubBackend(TranslationBackend):
+    """Deterministic offline backend for tests and benchmarks."""
+
+    name = "stub"
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        return {
+            "translated_text": f"[{target_lang}] {text}",
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "confidence": 1.0
+        }
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (LlamaBackend, GoogleBackend, StubBackend)
+}
+
+
+class TranslationEngine:
+    """
+    Routes translations over an ordered list of backends.
+
+    A request goes to the first backend that supports its language pair; if
+    that backend fails, the next supporting backend is tried. Remote backends
+    only serve as a fallback when `remote_fallback` is set. Results name the
+    backend that produced them and whether it was a fallback.
+    """
+
+    def __init__(self, backends: List[TranslationBackend], remote_fallback: bool = TRANSLATION_REMOTE_FALLBACK):
+        if not backends:
+            raise ValueError("At least one translation backend is required")
+        self.backends = backends
+        self.remote_fallback = remote_fallback
+
+    def translate(self, text: str, source_lang: str = "auto", target_lang: str = "en") -> Dict[str, Any]:
+        if source_lang == target_lang or not text.strip():
+            return {
+                "translated_text": text,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "confidence": 1.0
+            }
+
+        last_error: Optional[Exception] = None
+        skipped_remote = False
+        for position, backend in enumerate(self.backends):
+            if position > 0 and backend.remote and not self.remote_fallback:
+                skipped_remote = True
+                continue
+            if not backend.supports(text, source_lang, target_lang):
+                continue
+            started = time.perf_counter()
+            try:
+                with stage("translate"):
+                    result = backend.translate(text, source_lang, target_lang)
+            except Exception as e:
+                backend.stats.record(time.perf_counter() - started, ok=False)
+                logger.error(f"Translation backend '{backend.name}' failed: {str(e)}")
+                last_error = e
+                continue
+            backend.stats.record(time.perf_counter() - started, ok=True)
+            result = {**result, "backend": backend.name, "fallback": position > 0}
+            if position > 0:
+                result["fallback_reason"] = "error" if last_error is not None else "unsupported"
+            return result
+
+        if last_error is not None:
+            raise last_error
+        message = f"No translation backend supports '{source_lang}' -> '{target_lang}'"
+        if skipped_remote:
+            message += " (set TRANSLATION_REMOTE_FALLBACK=1 to allow remote backends)"
+        raise ValueError(message)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {backend.name: backend.stats.snapshot() for backend in self.backends}
+
+
+def build_engine(names: str = TRANSLATION_BACKENDS) -> TranslationEngine:
+    """Create an engine from a comma-separated list of backend names."""
+    backends = []
+    for name in (n.strip() for n in names.split(",")):
+        if not name:
+            continue
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown translation backend '{name}'. Available backends: {', '.join(BACKENDS)}")
+        backends.append(BACKENDS[name]())
+    return TranslationEngine(backends)
+
+
+# Shared by /translate, speech-to-text and text-to-speech
+translation_engine = build_engine()
+
+
+def translate(text: str, source_lang: str = "auto", target_lang: str = "en") -> Dict[str, Any]:
+    """Translate text with the shared engine."""
+    return translation_engine.translate(text, source_lang, target_lang)
@@ -0,0 +1,310 @@
+# backend/translation_memory.py
+import os
+import re
+import json
+import time
+import zlib
+import threading
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Approved sentence pairs are appended to this JSONL file and reloaded on startup
+TM_PATH = os.getenv("TM_PATH", "")
+# Minimum Jaccard similarity for returning a stored translation whose wording differs
+# beyond numbers and punctuation (set above 1 to only allow exact/patched hits)
+TM_FUZZY_THRESHOLD = float(os.getenv("TM_FUZZY_THRESHOLD", "0.95"))
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 31 - 1, size=NUM_PERM).astype(np.uint64)
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+# Languages that write decimals with a comma (2,5 mg) and may group thousands with a point
+DECIMAL_COMMA_LANGUAGES = {"de", "es", "fr", "it", "pt", "ru"}
+
+
+def mask_text(text: str) -> str:
+    """Lower-case, replace numbers with a placeholder and drop punctuation."""
+    masked = _NUMBER.sub("0", text.lower())
+    masked = _PUNCTUATION.sub(" ", masked)
+    return " ".join(masked.split())
+
+
+def shingles(masked: str) -> Set[int]:
+    padded = f" {masked} "
+    return {
+        zlib.crc32(padded[i:i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))
+    }
+
+
+def minhash(shingle_set: Set[int]) -> np.ndarray:
+    values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+    hashed = (values[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % _PRIME
+    return hashed.min(axis=0)
+
+
+def _band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [
+        (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+        for band in range(LSH_BANDS)
+    ]
+
+
+def number_value(number: str, lang: str) -> Optional[str]:
+    """
+    Read a number written in the convention of `lang` into a canonical form:
+    no grouping and "." as decimal mark. Returns None when it is ambiguous,
+    e.g. "1,5" in English, which is neither 1.5 nor a thousands group.
+    """
+    decimal, group = (",", ".") if lang in DECIMAL_COMMA_LANGUAGES else (".", ",")
+    whole, _, fraction = number.partition(decimal)
+    if decimal in fraction or group in fraction:
+        return None
+    groups = whole.split(group)
+    if any(len(g) != 3 for g in groups[1:]):
+        return None
+    return "".join(groups) + ("." + fraction if fraction else "")
+
+
+def format_number(value: str, lang: str) -> str:
+    """Write a canonical number with the decimal mark of `lang`, without grouping."""
+    return value.replace(".", ",") if lang in DECIMAL_COMMA_LANGUAGES else value
+
+
+def patch_numbers(source: str, target: str, new_source: str,
+                  source_lang: str = "en", target_lang: str = "en") -> Optional[str]:
+    """
+    Carry number changes from a new source sentence over to a stored translation.
+
+    Numbers are compared by value, read in the source language's convention,
+    and written into the translation in the target language's (2.5 becomes
+    2,5 in French). Returns None when the numbers cannot be mapped unambiguously.
+    """
+    old_numbers = [number_value(n, source_lang) for n in _NUMBER.findall(source)]
+    new_numbers = [number_value(n, source_lang) for n in _NUMBER.findall(new_source)]
+    if len(old_numbers) != len(new_numbers) or None in old_numbers or None in new_numbers:
+        return None
+    mapping: Dict[str, str] = {}
+    for old, new in zip(old_numbers, new_numbers):
+        if mapping.get(old, new) != new:
+            return None
+        mapping[old] = new
+    changed = {old: new for old, new in mapping.items() if old != new}
+    target_values = {number_value(n, target_lang) for n in _NUMBER.findall(target)}
+    if any(old not in target_values for old in changed):
+        return None
+
+    def _replace(match: "re.Match") -> str:
+        value = number_value(match.group(0), target_lang)
+        if value in changed:
+            return format_number(changed[value], target_lang)
+        return match.group(0)
+
+    return _NUMBER.sub(_replace, target)
+
+
+class _Entry:
+    __slots__ = ("source", "target", "masked", "shingles")
+
+    def __init__(self, source: str, target: str):
+        self.source = source
+        self.target = target
+        self.masked = mask_text(source)
+        self.shingles = shingles(self.masked)
+
+
+class PairStats:
+    def __init__(self):
+        self.lookups = 0
+        self.hits = {"exact": 0, "patched": 0, "fuzzy": 0}
+        self.lookup_seconds = 0.0
+        self.model_calls = 0
+        self.model_seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        hits = sum(self.hits.values())
+        avg_model = self.model_seconds / self.model_calls if self.model_calls else 0.0
+        return {
+            "lookups": self.lookups,
+            **{f"{kind}_hits": count for kind, count in self.hits.items()},
+            "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+            "avg_lookup_ms": round(1000 * self.lookup_seconds / self.lookups, 3) if self.lookups else 0.0,
+            # Each hit saves roughly one model generation for this pair
+            "latency_saved_seconds": round(hits * avg_model, 2),
+        }
+
+
+class TranslationMemory:
+    """
+    Approved sentence pairs with a MinHash/LSH index for near-duplicate lookup.
+
+    A query whose text matches a stored source except for numbers and
+    punctuation reuses the stored translation with the numbers patched in.
+    Other near duplicates are returned as-is above TM_FUZZY_THRESHOLD.
+    """
+
+    def __init__(self, path: str = "", fuzzy_threshold: float = TM_FUZZY_THRESHOLD):
+        self.path = path
+        self.fuzzy_threshold = fuzzy_threshold
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], List[_Entry]] = defaultdict(list)
+        self._by_masked: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(dict)
+        self._buckets: Dict[Tuple[str, str], Dict[Tuple[int, bytes], List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._stats: Dict[Tuple[str, str], PairStats] = defaultdict(PairStats)
+        self._offset = 0  # bytes of the file already loaded
+        if path and os.path.exists(path):
+            count = self._sync()
+            logger.info(f"Loaded {count} translation memory entries from {path}")
+
+    def _sync(self) -> int:
+        """
+        Load the entries appended to the file since the last call.
+        Other worker processes append to the same file, so every lookup
+        picks up their approvals. Call with the lock held.
+        """
+        try:
+            if os.path.getsize(self.path) <= self._offset:
+                return 0
+        except OSError:
+            return 0
+        count = 0
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # A line another process is still writing is read on a later call
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            if line.strip():
+                row = json.loads(line)
+                self._insert(row["source_text"], row["target_text"], row["source_lang"], row["target_lang"])
+                count += 1
+        self._offset += len(complete)
+        return count
+
+    def _insert(self, source: str, target: str, source_lang: str, target_lang: str) -> None:
+        pair = (source_lang, target_lang)
+        entry = _Entry(source, target)
+        entries = self._entries[pair]
+        existing = self._by_masked[pair].get(entry.masked)
+        if existing is not None and entries[existing].source == source:
+            entries[existing] = entry  # re-approval replaces the old translation
+            return
+        entry_id = len(entries)
+        entries.append(entry)
+        self._by_masked[pair].setdefault(entry.masked, entry_id)
+        for key in _band_keys(minhash(entry.shingles)):
+            self._buckets[pair][key].append(entry_id)
+
+    def add(self, source: str, target: str, source_lang: str, target_lang: str) -> None:
+        """Store an approved translation pair."""
+        with self._lock:
+            if not self.path:
+                self._insert(source, target, source_lang, target_lang)
+                return
+            line = json.dumps({
+                "source_text": source,
+                "target_text": target,
+                "source_lang": source_lang,
+                "target_lang": target_lang
+            }, ensure_ascii=False) + "\n"
+            # One append-mode write per entry, so lines from several processes never interleave
+            with open(self.path, "ab") as f:
+                f.write(line.encode("utf-8"))
+            self._sync()
+
+    def lookup(self, text: str, source_lang: str, target_lang: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a stored translation for text.
+
+        Returns:
+            Optional[Dict[str, Any]]: translated_text, similarity and the match
+            type ("exact", "patched" or "fuzzy"), or None on a miss
+        """
+        pair = (source_lang, target_lang)
+        started = time.perf_counter()
+        with self._lock:
+            if self.path:
+                self._sync()
+            if not self._entries.get(pair):
+                return None
+            result = self._lookup(text, pair)
+            stats = self._stats[pair]
+            stats.lookups += 1
+            stats.lookup_seconds += time.perf_counter() - started
+            if result is not None:
+                stats.hits[result["match"]] += 1
+        return result
+
+    def _lookup(self, text: str, pair: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        entries = self._entries[pair]
+        masked = mask_text(text)
+
+        # Same wording apart from numbers and punctuation
+        entry_id = self._by_masked[pair].get(masked)
+        if entry_id is not None:
+            entry = entries[entry_id]
+            if entry.source == text:
+                return {"translated_text": entry.target, "similarity": 1.0, "match": "exact"}
+            patched = patch_numbers(entry.source, entry.target, text, *pair)
+            if patched is not None:
+                return {"translated_text": patched, "similarity": 1.0, "match": "patched"}
+
+        # Near duplicates through the LSH buckets
+        query = shingles(masked)
+        candidates = set()
+        buckets = self._buckets[pair]
+        for key in _band_keys(minhash(query)):
+            candidates.update(buckets.get(key, ()))
+        best, best_similarity = None, 0.0
+        for candidate in candidates:
+            entry = entries[candidate]
+            similarity = len(query & entry.shingles) / len(query | entry.shingles)
+            if similarity > best_similarity:
+                best, best_similarity = entry, similarity
+        if best is not None and best_similarity >= self.fuzzy_threshold:
+            # Numbers are masked for matching; never serve a stored dose or value
+            # that differs from the request and cannot be patched
+            patched = patch_numbers(best.source, best.target, text, *pair)
+            if patched is None:
+                return None
+            return {
+                "translated_text": patched,
+                "similarity": round(best_similarity, 4),
+                "match": "fuzzy"
+            }
+        return None
+
+    def record_model_latency(self, source_lang: str, target_lang: str, seconds: float) -> None:
+        """Record how long a model translation took, to estimate the time hits save."""
+        with self._lock:
+            stats = self._stats[(source_lang, target_lang)]
+            stats.model_calls += 1
+            stats.model_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": sum(len(entries) for entries in self._entries.values()),
+                "pairs": {
+                    f"{source}->{target}": stats.snapshot()
+                    for (source, target), stats in self._stats.items()
+                }
+            }
+
+
+translation_memory = TranslationMemory(TM_PATH)
@@ -1,8 +1,10 @@
 import os
+import shutil
 import logging
-from gtts import gTTS
-from googletrans import Translator
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from backend.cache import AudioFileCache
+from backend.tts_engines import get_engine, synthesize
+from backend.translation_engine import translate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,21 +24,98 @@ LANGUAGE_VOICE_MAP = {
     "ar": "ar"  # Arabic
 }
 
-def text_to_speech(text: str, output_path: str, target_language: str) -> Dict[str, Any]:
+# Synthesized audio is cached on disk by a hash of the text, language and voice
+TTS_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "temp", "tts_cache")
+)
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "200"))
+
+# Speech synthesis backend: "gtts" (network), "pyttsx3" or "espeak" (offline)
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")
+
+audio_cache = AudioFileCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 1024 * 1024)
+
+# Media types of the audio formats the cache can hold
+AUDIO_MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav"
+}
+
+def find_cached_audio(audio_id: str, pin: bool = False) -> Optional[str]:
+    """
+    Return the cached audio file for an id returned by text_to_speech, if it still exists.
+    With pin, the file is kept until audio_cache.unpin is called.
+    """
+    if len(audio_id) != 64 or any(c not in "0123456789abcdef" for c in audio_id):
+        return None
+    for extension in AUDIO_MEDIA_TYPES:
+        path = audio_cache.peek(audio_id, extension, pin=pin)
+        if path is not None:
+            return path
+    return None
+
+def audio_media_type(path: str) -> str:
+    return AUDIO_MEDIA_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+
+def synthesize_speech(text: str, target_language: str = "en", pin: bool = False) -> Dict[str, Any]:
+    """
+    Synthesize text that is already in the target language, reusing cached audio.
+    Returns the cached audio file path, its id and whether it was a cache hit.
+    With pin, the file is kept until audio_cache.unpin is called.
+    """
+    target_voice = LANGUAGE_VOICE_MAP.get(target_language)
+    if not target_voice:
+        raise ValueError(
+            f"Unsupported language '{target_language}'. Supported languages: {', '.join(LANGUAGE_VOICE_MAP.keys())}"
+        )
+
+    engine = get_engine(TTS_ENGINE)
+    key = audio_cache.key(text, target_language, target_voice, engine.name)
+    audio_path = audio_cache.get(key, engine.extension, pin=pin)
+    cached = audio_path is not None
+    if not cached:
+        audio_path = audio_cache.put(
+            key,
+            engine.extension,
+            lambda tmp_path: synthesize(engine, text, target_voice, tmp_path),
+            pin=pin
+        )
+    return {"audio_file": audio_path, "audio_id": key, "cached": cached}
+
+def translate_for_speech(text: str, source_language: str = "auto", target_language: str = "en") -> Dict[str, Any]:
+    """
+    Translate text into the language it will be spoken in.
+    Text already in the target language is returned as is, without loading a model.
     """
-    Convert text to speech using gTTS (Google Text-to-Speech).
+    if source_language == target_language:
+        return {"translated_text": text, "backend": None, "fallback": False}
+    return translate(text, source_lang=source_language, target_lang=target_language)
+
+def text_to_speech(
+    text: str,
+    output_path: Optional[str] = None,
+    target_language: str = "en",
+    source_language: str = "auto",
+    translation: Optional[Dict[str, Any]] = None,
+    pin: bool = False
+) -> Dict[str, Any]:
+    """
+    Convert text to speech using the configured TTS engine (gTTS by default).
     Takes the input text, translates it to the target language, and generates speech.
     Returns both the audio file path and the translated transcript.
+
+    Pass the result of translate_for_speech as `translation` to translate
+    elsewhere (the API runs it on the LLM pool) and only synthesize here.
+
+    The audio is served from the content-addressed cache; when output_path is
+    given, a copy of the cached file is written there as well. With pin, the
+    cached file is kept until audio_cache.unpin is called.
     """
     try:
         logger.info(f"Starting TTS conversion for text: {text}")
         logger.info(f"Target language: {target_language}")
 
-        # Ensure the output directory exists
-        output_dir = os.path.dirname(output_path)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-
         # Get the language code for the target language
         target_voice = LANGUAGE_VOICE_MAP.get(target_language)
         if not target_voice:
@@ -45,22 +124,37 @@ def text_to_speech(text: str, output_path: str, target_language: str) -> Dict[st
             )
 
         # Translate the text to the target language
-        translator = Translator()
-        translated = translator.translate(text, dest=target_language)
-        translated_text = translated.text
+        if translation is None:
+            translation = translate_for_speech(text, source_language, target_language)
+        translated_text = translation["translated_text"]
 
         logger.info(f"Translated text: {translated_text}")
 
-        # Generate speech using gTTS with the translated text
-        tts = gTTS(text=translated_text, lang=target_voice)
-        tts.save(output_path)
+        # Reuse identical audio, otherwise generate speech with the translated text
+        # A copy to output_path is made from a pinned file, so eviction cannot remove it mid-copy
+        speech = synthesize_speech(translated_text, target_language, pin=pin or bool(output_path))
+        audio_path = speech["audio_file"]
+
+        if output_path:
+            try:
+                output_dir = os.path.dirname(output_path)
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                shutil.copyfile(audio_path, output_path)
+            finally:
+                audio_cache.unpin(audio_path)
+            audio_path = output_path
 
-        logger.info(f"Speech saved to: {output_path}")
+        logger.info(f"Speech saved to: {audio_path}")
 
         # Return the audio file path and translated transcript
         return {
-            "audio_file": output_path,
-            "transcribed_text": translated_text  # Ensure the transcribed text matches the output language
+            "audio_file": audio_path,
+            "audio_id": speech["audio_id"],
+            "transcribed_text": translated_text,  # Ensure the transcribed text matches the output language
+            "translation_backend": translation.get("backend"),
+            "translation_fallback": translation.get("fallback", False),
+            "cached": speech["cached"]
         }
     except Exception as e:
         logger.error(f"TTS conversion failed: {str(e)}")
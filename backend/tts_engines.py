@@ -0,0 +1,257 @@
+# backend/tts_engines.py
+import os
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+import wave
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+from backend.metrics import stage
+from backend.text_utils import split_into_chunks
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Sentences of one long text synthesized at the same time
+TTS_SENTENCE_WORKERS = int(os.getenv("TTS_SENTENCE_WORKERS", "4"))
+
+# pydub needs ffmpeg to join sentences in formats other than WAV (gTTS writes MP3);
+# without it such texts are synthesized in one piece
+FFMPEG_PATH = shutil.which("ffmpeg") or shutil.which("avconv")
+
+# espeak names a few voices differently from the gTTS language codes
+ESPEAK_VOICE_MAP = {
+    "zh-CN": "cmn",
+    "zh-TW": "yue",
+}
+
+
+class EngineStats:
+    """Latency and error counters for one engine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.sentences = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, sentences: int, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.sentences += sentences
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if not ok:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "sentences": self.sentences,
+                "avg_ms": round(1000 * self.total_seconds / self.calls, 2) if self.calls else 0.0,
+                "max_ms": round(1000 * self.max_seconds, 2),
+            }
+
+
+class TTSEngine:
+    """
+    Base class for speech synthesis backends.
+
+    Subclasses write the speech for `text` to `output_path` in their
+    `extension` format. Engines that cannot run concurrently set
+    `parallel = False` and are serialized.
+    """
+
+    name = "base"
+    extension = ".wav"
+    audio_format = "wav"
+    parallel = True
+
+    def __init__(self):
+        self.stats = EngineStats()
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        raise NotImplementedError
+
+    def synthesize_sentence(self, text: str, voice: str, output_path: str) -> None:
+        if self.parallel:
+            self.synthesize(text, voice, output_path)
+        else:
+            with self._lock:
+                self.synthesize(text, voice, output_path)
+
+
+class GTTSEngine(TTSEngine):
+    """Google Text-to-Speech; needs network access."""
+
+    name = "gtts"
+    extension = ".mp3"
+    audio_format = "mp3"
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        from gtts import gTTS
+        gTTS(text=text, lang=voice).save(output_path)
+
+
+class Pyttsx3Engine(TTSEngine):
+    """
+    Offline synthesis through the platform speech driver (SAPI5, NSSpeech or espeak).
+
+    The pyttsx3 engine and its driver loop belong to the thread that created
+    them (COM on Windows, the run loop on macOS), so every call runs on one
+    dedicated thread owned by this engine, which also serializes them.
+    """
+
+    name = "pyttsx3"
+
+    def __init__(self):
+        super().__init__()
+        self._engine = None
+        self._default_voice = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        self._executor.submit(self._synthesize, text, voice, output_path).result()
+
+    def _synthesize(self, text: str, voice: str, output_path: str) -> None:
+        import pyttsx3
+        if self._engine is None:
+            self._engine = pyttsx3.init()
+            self._default_voice = self._engine.getProperty("voice")
+        language = voice.split("-")[0].lower()
+        # Without a matching voice, fall back to the default rather than the previous request's language
+        selected = self._default_voice
+        for candidate in self._engine.getProperty("voices"):
+            languages = [
+                (lang.decode("utf-8", "ignore") if isinstance(lang, bytes) else str(lang)).lower()
+                for lang in (candidate.languages or [])
+            ]
+            if any(language in lang for lang in languages) or candidate.id.lower().endswith(language):
+                selected = candidate.id
+                break
+        self._engine.setProperty("voice", selected)
+        self._engine.save_to_file(text, output_path)
+        self._engine.runAndWait()
+
+
+class EspeakEngine(TTSEngine):
+    """Offline synthesis with the espeak-ng (or espeak) command line tool; fully parallel."""
+
+    name = "espeak"
+
+    def __init__(self):
+        super().__init__()
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        if self.binary is None:
+            raise RuntimeError("espeak-ng is not installed")
+        subprocess.run(
+            [self.binary, "-v", ESPEAK_VOICE_MAP.get(voice, voice), "-w", output_path, "--stdin"],
+            input=text.encode("utf-8"),
+            check=True,
+            capture_output=True,
+            timeout=60
+        )
+
+
+class StubEngine(TTSEngine):
+    """Deterministic offline engine for tests and benchmarks: writes silence sized to the text."""
+
+    name = "stub"
+    sample_rate = 16000
+    seconds_per_char = 0.06
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        frames = int(self.sample_rate * self.seconds_per_char * max(len(text), 1))
+        with wave.open(output_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(b"\x00\x00" * frames)
+
+
+ENGINES = {
+    engine.name: engine
+    for engine in (GTTSEngine, Pyttsx3Engine, EspeakEngine, StubEngine)
+}
+
+_instances: Dict[str, TTSEngine] = {}
+_instances_lock = threading.Lock()
+_sentence_executor = ThreadPoolExecutor(max_workers=TTS_SENTENCE_WORKERS, thread_name_prefix="tts-sentence")
+
+
+def get_engine(name: str) -> TTSEngine:
+    """Return the shared instance of a TTS engine by name."""
+    with _instances_lock:
+        if name not in _instances:
+            if name not in ENGINES:
+                raise ValueError(f"Unknown TTS engine '{name}'. Available engines: {', '.join(ENGINES)}")
+            engine = ENGINES[name]()
+            if engine.audio_format != "wav" and FFMPEG_PATH is None:
+                logger.warning(
+                    f"ffmpeg not found: {name} texts are synthesized in one piece instead of one sentence per worker"
+                )
+            _instances[name] = engine
+        return _instances[name]
+
+
+def register_engine(engine_class: type) -> None:
+    """Make an additional engine available to get_engine()."""
+    ENGINES[engine_class.name] = engine_class
+
+
+def synthesize(engine: TTSEngine, text: str, voice: str, output_path: str) -> None:
+    """
+    Synthesize text with the engine, one sentence per worker.
+
+    Long texts are split into sentences that are synthesized in parallel and
+    concatenated in order with pydub; a single sentence is written directly,
+    and so is the whole text when joining its format would need a missing ffmpeg.
+    """
+    sentences: List[str] = [chunk.strip() for chunk, _ in split_into_chunks(text) if chunk.strip()]
+    joinable = engine.audio_format == "wav" or FFMPEG_PATH is not None
+    started = time.perf_counter()
+    ok = False
+    try:
+        with stage("synthesis"):
+            if len(sentences) <= 1 or not joinable:
+                engine.synthesize_sentence(text, voice, output_path)
+            else:
+                _synthesize_sentences(engine, sentences, voice, output_path)
+        ok = True
+    finally:
+        engine.stats.record(time.perf_counter() - started, max(len(sentences), 1), ok)
+
+
+def _synthesize_sentences(engine: TTSEngine, sentences: List[str], voice: str, output_path: str) -> None:
+    from pydub import AudioSegment
+
+    with tempfile.TemporaryDirectory(prefix="tts-") as work_dir:
+        paths = [os.path.join(work_dir, f"{i:04d}{engine.extension}") for i in range(len(sentences))]
+        futures = [
+            _sentence_executor.submit(engine.synthesize_sentence, sentence, voice, path)
+            for sentence, path in zip(sentences, paths)
+        ]
+        for future in futures:
+            future.result()
+
+        combined = AudioSegment.empty()
+        for path in paths:
+            combined += AudioSegment.from_file(path, format=engine.audio_format)
+        combined.export(output_path, format=engine.audio_format)
+
+
+def engine_stats() -> Dict[str, Dict[str, Any]]:
+    """Return latency statistics for every engine that has been used."""
+    with _instances_lock:
+        return {name: engine.stats.snapshot() for name, engine in _instances.items()}
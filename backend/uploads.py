@@ -0,0 +1,89 @@
+# backend/uploads.py
+import logging
+from typing import Iterable
+from fastapi import HTTPException, UploadFile
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {max_size // (1024 * 1024)}MB."
+    )
+
+
+async def read_upload(upload: UploadFile, max_size: int) -> bytes:
+    """
+    Read an uploaded file chunk by chunk, rejecting it as soon as it exceeds max_size.
+    """
+    chunks = []
+    received = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        received += len(chunk)
+        if received > max_size:
+            raise _too_large(max_size)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that enforces a request body limit while the body streams in.
+
+    Requests announcing a larger Content-Length are rejected before any of the
+    body is read; otherwise the received bytes are counted and the request is
+    aborted with 413 the moment the limit is crossed, so an oversized upload is
+    never fully buffered or spooled to disk.
+    """
+
+    def __init__(self, app, max_body_size: int, paths: Iterable[str]):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # The multipart envelope adds a little on top of the file itself
+        limit = self.max_body_size + UPLOAD_CHUNK_SIZE
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    logger.warning(f"Upload to {scope['path']} exceeded {limit} bytes")
+                    raise _too_large(self.max_body_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send) -> None:
+        body = b'{"detail":"File too large. Maximum size is %dMB."}' % (self.max_body_size // (1024 * 1024))
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,310 @@
+"""
+Benchmark the translation, speech-to-text and text-to-speech endpoints.
+
+Requests go through the FastAPI app in-process (or to a running server with
+--url) at several concurrency levels. Latency percentiles and throughput are
+reported per scenario and concurrency level. By default the models are
+replaced by deterministic stubs, so the numbers reflect the serving path and
+runs work offline. --real loads the real models instead.
+
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --real --scenarios stt --concurrency 1 2 4
+    python -m benchmarks.bench_api --compare benchmarks/results/baseline.json
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+import wave
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+AUDIO_FIXTURES = [
+    os.path.join(ROOT, "temp", "recorded_audio.wav"),
+    os.path.join(ROOT, "output", "output.wav"),
+]
+SENTENCES = [
+    "The patient reports chest pain radiating to the left arm since yesterday.",
+    "Take two tablets of ibuprofen twice daily after meals.",
+    "Do you have any allergies to penicillin or other antibiotics?",
+    "Her blood pressure was 150 over 95 at the last visit.",
+    "Please describe when the headaches started and how often they occur.",
+    "We will schedule an MRI of the lumbar spine next week.",
+]
+SCENARIOS = ["translate", "stt", "tts"]
+
+
+class _Segment(NamedTuple):
+    text: str
+    start: float
+    end: float
+    avg_logprob: float
+
+
+class StubWhisperModel:
+    """Returns one fixed segment spanning the whole recording without running a model."""
+
+    def transcribe(self, audio, language=None, **kwargs):
+        duration = len(audio) / 16000
+        segments = [_Segment(" The patient reports chest pain.", 0.0, duration, -0.1)]
+        return iter(segments), SimpleNamespace(language=language or "en", duration=duration)
+
+
+def configure_stubs() -> str:
+    """Select the offline backends; must run before the backend modules are imported."""
+    tts_cache_dir = tempfile.mkdtemp(prefix="bench-tts-")
+    os.environ["TRANSLATION_BACKENDS"] = "stub"
+    os.environ["TTS_ENGINE"] = "stub"
+    os.environ["TTS_CACHE_DIR"] = tts_cache_dir
+    os.environ["WARMUP_MODELS"] = ""
+    return tts_cache_dir
+
+
+def sentence(i: int, repeat: bool) -> str:
+    text = SENTENCES[i % len(SENTENCES)]
+    # Unique texts measure the uncached path; --repeat measures the caches
+    return text if repeat else f"Case {i}: {text}"
+
+
+def unique_audio(content: bytes, i: int) -> bytes:
+    """
+    Write the request number into the first samples of a WAV recording.
+
+    The change is inaudible, but the transcript cache is keyed by a hash of the
+    audio bytes, so every request takes the uncached path.
+    """
+    with wave.open(io.BytesIO(content)) as source:
+        params = source.getparams()
+        frames = bytearray(source.readframes(params.nframes))
+    frames[:4] = i.to_bytes(4, "little")
+    output = io.BytesIO()
+    with wave.open(output, "wb") as target:
+        target.setparams(params)
+        target.writeframes(bytes(frames))
+    return output.getvalue()
+
+
+def is_cache_hit(response: httpx.Response) -> bool:
+    """Whether a JSON response was answered from a cache or the translation memory."""
+    if response.is_error or not response.headers.get("content-type", "").startswith("application/json"):
+        return False
+    body = response.json()
+    return bool(body.get("cached")) or body.get("model_used") == "translation-memory"
+
+
+def build_scenarios(repeat: bool) -> Dict[str, Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]]:
+    audio = []
+    for path in AUDIO_FIXTURES:
+        with open(path, "rb") as f:
+            audio.append((os.path.basename(path), f.read()))
+
+    async def translate(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/translate", json={
+            "text": sentence(i, repeat),
+            "source_language": "en",
+            "target_language": "es"
+        })
+
+    async def stt(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        name, content = audio[i % len(audio)]
+        if not repeat:
+            content = unique_audio(content, i)
+        return await client.post(
+            "/stt",
+            files={"audio_file": (name, content, "audio/wav")},
+            data={"input_language": "en", "output_language": "es"}
+        )
+
+    async def tts(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/tts/audio", json={"text": sentence(i, repeat), "target_language": "es"})
+
+    return {"translate": translate, "stt": stt, "tts": tts}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+
+async def run_level(client: httpx.AsyncClient, scenario, concurrency: int, requests: int, offset: int) -> Dict[str, Any]:
+    """Send `requests` requests with `concurrency` in flight and summarize latencies."""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    cache_hits = 0
+    indexes = iter(range(offset, offset + requests))
+
+    async def worker() -> None:
+        nonlocal cache_hits
+        for i in indexes:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, i)
+                status = str(response.status_code)
+                if not response.is_error:
+                    latencies.append(time.perf_counter() - started)
+                    cache_hits += is_cache_hit(response)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": requests - len(latencies),
+        "status_counts": dict(statuses),
+        # Only JSON responses say whether they were cached (not /tts/audio)
+        "cache_hits": cache_hits,
+        "p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 99), 2),
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_ms": round(1000 * latencies[-1], 2) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "wall_seconds": round(wall, 3),
+    }
+
+
+async def run_benchmark(client: httpx.AsyncClient, args) -> Dict[str, Any]:
+    scenarios = build_scenarios(args.repeat)
+    results: Dict[str, Any] = {}
+    offset = 0
+    for name in args.scenarios:
+        scenario = scenarios[name]
+        for i in range(args.warmup):
+            await scenario(client, offset + i)
+        offset += args.warmup
+        results[name] = {}
+        for concurrency in args.concurrency:
+            level = await run_level(client, scenario, concurrency, args.requests, offset)
+            offset += args.requests
+            results[name][str(concurrency)] = level
+            print(f"{name:<10} c={concurrency:<4} p50={level['p50_ms']:>9.2f}ms p95={level['p95_ms']:>9.2f}ms "
+                  f"p99={level['p99_ms']:>9.2f}ms {level['throughput_rps']:>8.2f} req/s errors={level['errors']} "
+                  f"cache_hits={level['cache_hits']}")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """Print latency and throughput changes relative to a baseline run."""
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '')}):")
+    for name, levels in current["scenarios"].items():
+        for concurrency, level in levels.items():
+            old = baseline.get("scenarios", {}).get(name, {}).get(concurrency)
+            if old is None:
+                continue
+            print(f"{name:<10} c={concurrency:<4} "
+                  f"p50 {change(old['p50_ms'], level['p50_ms']):>8}  "
+                  f"p95 {change(old['p95_ms'], level['p95_ms']):>8}  "
+                  f"p99 {change(old['p99_ms'], level['p99_ms']):>8}  "
+                  f"throughput {change(old['throughput_rps'], level['throughput_rps']):>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--real", action="store_true", help="use the real models instead of stubs")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured requests before each scenario")
+    parser.add_argument("--repeat", action="store_true", help="send identical texts so caches are exercised")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/api-<mode>-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    mode = "remote" if args.url else ("real" if args.real else "stub")
+    tts_cache_dir = configure_stubs() if mode == "stub" else None
+    try:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=300)
+        else:
+            from backend.app import app
+            from backend.registry import registry
+
+            # The benchmark is a single client; per-IP rate limits would only measure 429s
+            app.state.limiter.enabled = False
+            if mode == "stub":
+                registry.override("whisper", StubWhisperModel)
+            else:
+                # Load the models up front so loading time is not part of the latencies
+                for name in ("whisper", "translator"):
+                    registry.get(name)
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://localhost", timeout=300
+            )
+
+        async def _run() -> Dict[str, Any]:
+            async with client:
+                scenarios = await run_benchmark(client, args)
+                stats = (await client.get("/stats")).json()
+            return {"scenarios": scenarios, "server_stats": stats}
+
+        measured = asyncio.run(_run())
+    finally:
+        if tts_cache_dir:
+            shutil.rmtree(tts_cache_dir, ignore_errors=True)
+
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    results = {
+        "benchmark": "api",
+        "mode": mode,
+        "timestamp": timestamp,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+        },
+        **measured,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"api-{mode}-{timestamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compare speculative decoding modes of the translation model.
+
+Loads MedicalTranslator once per mode, translates the same medical sentences
+(drug names, dosages and lab values that the output copies from the source)
+and reports generated tokens per second, translation latency and, for the
+speculative modes, the draft acceptance rate and the speedup over plain decoding.
+
+    python -m benchmarks.bench_speculative
+    python -m benchmarks.bench_speculative --modes none draft --draft-model backend/models/Llama-3.2-1B.Q4_K_M.gguf
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SENTENCES = [
+    "Take metformin 500 mg twice daily with meals and check your HbA1c in 3 months.",
+    "Start amoxicillin-clavulanate 875/125 mg every 12 hours for 7 days.",
+    "Potassium was 3.1 mmol/L and creatinine 1.4 mg/dL on admission.",
+    "Apply hydrocortisone 1% cream to the affected area twice a day.",
+    "The patient was given 4 mg of ondansetron IV for nausea at 14:30.",
+    "Continue atorvastatin 40 mg at bedtime; LDL target is below 70 mg/dL.",
+    "Inject enoxaparin 40 mg subcutaneously once daily until discharge.",
+    "Blood pressure 142/88 mmHg, heart rate 96 bpm, SpO2 94% on room air.",
+]
+
+
+def run_mode(mode: str, args) -> Dict[str, Any]:
+    from backend.translation import MedicalTranslator
+
+    started = time.perf_counter()
+    translator = MedicalTranslator(model_path=args.model, n_threads=args.threads, speculative_mode=mode)
+    load_seconds = time.perf_counter() - started
+
+    # Unmeasured: loads the prompt prefix snapshot and warms up the threads
+    translator.translate_text(SENTENCES[0], args.source, args.target)
+    before = translator.decoding_stats()
+
+    latencies: List[float] = []
+    for _ in range(args.runs):
+        for sentence in SENTENCES:
+            started = time.perf_counter()
+            translator.translate_text(sentence, args.source, args.target)
+            latencies.append(time.perf_counter() - started)
+    after = translator.decoding_stats()
+
+    tokens = after["generated_tokens"] - before["generated_tokens"]
+    seconds = after["generation_seconds"] - before["generation_seconds"]
+    latencies.sort()
+    result = {
+        "load_seconds": round(load_seconds, 2),
+        "translations": len(latencies),
+        "generated_tokens": tokens,
+        "tokens_per_second": round(tokens / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(1000 * latencies[len(latencies) // 2], 2),
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 2),
+    }
+    if "proposed_tokens" in after:
+        proposed = after["proposed_tokens"] - before["proposed_tokens"]
+        accepted = after["accepted_tokens"] - before["accepted_tokens"]
+        result.update({
+            "proposed_tokens": proposed,
+            "accepted_tokens": accepted,
+            "acceptance_rate": round(accepted / proposed, 4) if proposed else 0.0,
+            "draft_ms": round(after["draft_ms"] - before["draft_ms"], 2),
+        })
+
+    del translator
+    gc.collect()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["none", "prompt_lookup"],
+                        choices=["none", "prompt_lookup", "draft"])
+    parser.add_argument("--model", help="translation model file (default: the MedicalTranslator model)")
+    parser.add_argument("--draft-model", help="draft GGUF model for the draft mode (default: DRAFT_MODEL_PATH)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--runs", type=int, default=3, help="passes over the sentences per mode")
+    parser.add_argument("--source", default="en")
+    parser.add_argument("--target", default="es")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    # Read by backend.speculative at import time
+    if args.draft_model:
+        os.environ["DRAFT_MODEL_PATH"] = args.draft_model
+    from backend.translation import MODEL_PATH
+
+    args.model = args.model or MODEL_PATH
+
+    results: Dict[str, Any] = {}
+    for mode in args.modes:
+        results[mode] = run_mode(mode, args)
+
+    baseline = results.get("none")
+    for mode, result in results.items():
+        if baseline and mode != "none" and baseline["tokens_per_second"]:
+            result["speedup"] = round(result["tokens_per_second"] / baseline["tokens_per_second"], 2)
+        line = f"{mode:<14} {result['tokens_per_second']:>8.2f} tok/s  p50={result['p50_ms']:>9.2f}ms"
+        if "acceptance_rate" in result:
+            line += f"  acceptance={100 * result['acceptance_rate']:.1f}%"
+        if "speedup" in result:
+            line += f"  speedup={result['speedup']:.2f}x"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "model": os.path.basename(args.model),
+                "draft_model": os.path.basename(args.draft_model or os.getenv("DRAFT_MODEL_PATH", "")),
+                "threads": args.threads,
+                "runs": args.runs,
+                "language_pair": f"{args.source}->{args.target}",
+                "modes": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
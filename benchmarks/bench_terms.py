@@ -0,0 +1,99 @@
+"""
+Benchmark the medical terminology index.
+
+Builds an index from a terminology file (or a synthetic vocabulary), measures
+build, save and load time, then scans a long synthetic transcript.
+
+    python -m benchmarks.bench_terms --terms 200000 --transcript-chars 1000000
+    python -m benchmarks.bench_terms --terms-file terms.tsv
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.medical_utils import TermIndex  # noqa: E402
+
+SYLLABLES = ["car", "dio", "my", "o", "pa", "thy", "neph", "ro", "hepa", "to", "gas", "tri",
+             "tis", "al", "gia", "os", "teo", "ar", "thri", "hyper", "ten", "sion", "emia"]
+FILLER = ["the", "patient", "reports", "pain", "since", "yesterday", "and", "was", "given",
+          "twice", "daily", "with", "no", "history", "of", "fever", "in", "left", "arm"]
+
+
+def synthetic_terms(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    languages = ["en", "es", "fr", "de"]
+    for i in range(count):
+        words = [
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+            for _ in range(rng.choice([1, 1, 1, 2, 3]))
+        ]
+        yield " ".join(words), languages[i % len(languages)], "synthetic"
+
+
+def synthetic_transcript(terms, chars: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(terms) if rng.random() < 0.05 else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms-file", help="terminology file (one term per line or term<TAB>lang<TAB>category)")
+    parser.add_argument("--terms", type=int, default=200000, help="synthetic vocabulary size")
+    parser.add_argument("--transcript-chars", type=int, default=1000000, help="length of the scanned transcript")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.terms_file:
+        index = TermIndex.from_file(args.terms_file)
+    else:
+        index = TermIndex.build(synthetic_terms(args.terms))
+    build_seconds = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "terms.idx")
+        started = time.perf_counter()
+        index.save(path)
+        save_seconds = time.perf_counter() - started
+        index_bytes = os.path.getsize(path)
+        started = time.perf_counter()
+        index = TermIndex.load(path)
+        load_seconds = time.perf_counter() - started
+
+    transcript = synthetic_transcript(index.terms, args.transcript_chars)
+    started = time.perf_counter()
+    matches = index.find_all(transcript)
+    scan_seconds = time.perf_counter() - started
+
+    results = {
+        "terms": len(index),
+        "nodes": len(index.fail),
+        "build_seconds": round(build_seconds, 3),
+        "save_seconds": round(save_seconds, 3),
+        "load_seconds": round(load_seconds, 3),
+        "index_bytes": index_bytes,
+        "transcript_chars": len(transcript),
+        "matches": len(matches),
+        "scan_seconds": round(scan_seconds, 3),
+        "chars_per_second": round(len(transcript) / scan_seconds),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
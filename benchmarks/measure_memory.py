@@ -0,0 +1,66 @@
+"""
+Measure the resident memory of a running server and its workers (Linux).
+
+Reads /proc/<pid>/smaps_rollup for the given process and all of its
+children. RSS counts shared pages once per process; PSS splits them between
+the processes sharing them, so the PSS total is what the server really uses.
+
+    python -m benchmarks.measure_memory --pid <pre-fork server pid>
+    python -m benchmarks.measure_memory --pid 1234 --output memory.json
+"""
+import os
+import sys
+import json
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.serve import memory_report  # noqa: E402
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing parenthesis
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pid", type=int, required=True, help="server (parent) process id")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    workers = child_pids(args.pid)
+    report = memory_report([args.pid, *workers])
+    total = report.pop("total")
+    results = {
+        "parent": args.pid,
+        "workers": len(workers),
+        "processes": {
+            pid: {name: round(value / 2**20, 1) for name, value in memory.items()}
+            for pid, memory in report.items()
+        },
+        "total_rss_mb": round(total.get("rss", 0) / 2**20, 1),
+        "total_pss_mb": round(total.get("pss", 0) / 2**20, 1),
+        # Memory the workers would need on top if nothing were shared
+        "shared_savings_mb": round((total.get("rss", 0) - total.get("pss", 0)) / 2**20, 1),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+import json
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from audio_recorder_streamlit import audio_recorder
-import base64
+from urllib.parse import unquote
 
 # Set page configuration
 st.set_page_config(
@@ -53,6 +56,217 @@ LANGUAGES = {
     "ar": "Arabic"
 }
 
+# (connect, read) timeouts in seconds; long recordings can take minutes to transcribe
+REQUEST_TIMEOUT = (5, 300)
+# Show translations and transcripts while they are generated (/translate/stream, /stt/segments)
+STREAM_RESPONSES = True
+# Finished streamed results kept per browser session
+STREAM_MEMO_SIZE = 50
+
+
+class APIError(Exception):
+    """Error response from the backend."""
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """
+    One pooled keep-alive session shared by every rerun and browser session.
+    Connection errors and overloaded-server responses (503 with Retry-After)
+    are retried with backoff; all requests here are safe to repeat.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def raise_for_error(response: requests.Response, default: str):
+    if response.status_code == 200:
+        return
+    try:
+        message = response.json().get("error")
+    except ValueError:
+        message = None
+    raise APIError(message or default)
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=500)
+def fetch_translation(text: str, source_lang: str, target_lang: str) -> dict:
+    # Errors are raised, so only successful responses are memoized
+    response = get_session().post(
+        f"{API_URL}/translate",
+        json={
+            "text": text,
+            "source_language": source_lang,
+            "target_language": target_lang
+        },
+        timeout=REQUEST_TIMEOUT
+    )
+    raise_for_error(response, "Unknown error occurred")
+    return response.json()
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=50)
+def fetch_transcription(audio_bytes: bytes, input_lang: str, output_lang: str) -> dict:
+    files = {"audio_file": ("audio.wav", audio_bytes, "audio/wav")}
+    response = get_session().post(
+        f"{API_URL}/stt",
+        files=files,
+        data={
+            "input_language": input_lang,
+            "output_language": output_lang
+        },
+        timeout=REQUEST_TIMEOUT
+    )
+    raise_for_error(response, "Failed to process audio")
+    return response.json()
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=100)
+def fetch_speech(text: str, target_lang: str, source_lang: str = "auto") -> dict:
+    response = get_session().post(
+        f"{API_URL}/tts/audio",
+        json={
+            "text": text,
+            "source_language": source_lang,
+            "target_language": target_lang
+        },
+        timeout=REQUEST_TIMEOUT
+    )
+    raise_for_error(response, "Failed to generate speech")
+    return {
+        "transcript": response.headers.get("X-Transcript"),
+        "content": response.content,
+        "content_type": response.headers.get("Content-Type", "audio/mpeg")
+    }
+
+
+def iter_events(response: requests.Response):
+    """Parse a Server-Sent Events or newline-delimited JSON response into event dicts."""
+    response.encoding = "utf-8"
+    event_type = None
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            continue
+        if line.startswith("event:"):
+            event_type = line[len("event:"):].strip()
+            continue
+        if line.startswith("data:"):
+            line = line[len("data:"):]
+        event = json.loads(line)
+        if event_type and "type" not in event:
+            event["type"] = event_type
+        event_type = None
+        yield event
+
+
+def remember(key: tuple, value: dict):
+    """Keep a finished streamed result so an identical request is answered without the backend."""
+    memo = st.session_state.setdefault("stream_results", {})
+    memo.pop(key, None)
+    memo[key] = value
+    while len(memo) > STREAM_MEMO_SIZE:
+        memo.pop(next(iter(memo)))
+
+
+def recall(key: tuple):
+    return st.session_state.get("stream_results", {}).get(key)
+
+
+def stream_translation(text: str, source_lang: str, target_lang: str, placeholder) -> str:
+    """
+    Translate over /translate/stream, rendering tokens into `placeholder` as
+    they arrive. Falls back to /translate if the backend has no streaming endpoint.
+    """
+    key = ("translate", text, source_lang, target_lang)
+    result = recall(key)
+    if result is not None:
+        placeholder.write(result["translated_text"])
+        return result["translated_text"]
+
+    with get_session().post(
+        f"{API_URL}/translate/stream",
+        json={
+            "text": text,
+            "source_language": source_lang,
+            "target_language": target_lang
+        },
+        stream=True,
+        timeout=REQUEST_TIMEOUT
+    ) as response:
+        if response.status_code in (404, 405):
+            translated = fetch_translation(text, source_lang, target_lang)["translated_text"]
+            placeholder.write(translated)
+            return translated
+        raise_for_error(response, "Unknown error occurred")
+
+        partial = ""
+        for event in iter_events(response):
+            if event["type"] == "token":
+                partial += event["text"]
+                placeholder.markdown(partial + " ▌")
+            elif event["type"] == "final":
+                remember(key, event)
+                # The final text is cleaned up by the backend and may differ from the raw tokens
+                placeholder.write(event["translated_text"])
+                return event["translated_text"]
+            elif event["type"] == "error":
+                raise APIError(event.get("error", "Unknown error occurred"))
+    raise APIError("The translation stream ended unexpectedly")
+
+
+def stream_transcription(audio_bytes: bytes, input_lang: str, output_lang: str, placeholder) -> str:
+    """
+    Transcribe over /stt/segments, rendering the transcript as segments arrive,
+    then stream the translation when the output language differs.
+    Falls back to /stt if the backend has no streaming endpoint.
+    """
+    key = ("stt", audio_bytes, input_lang, output_lang)
+    result = recall(key)
+    if result is not None:
+        placeholder.write(result["transcribed_text"])
+        return result["transcribed_text"]
+
+    files = {"audio_file": ("audio.wav", audio_bytes, "audio/wav")}
+    with get_session().post(
+        f"{API_URL}/stt/segments",
+        files=files,
+        data={"input_language": input_lang},
+        stream=True,
+        timeout=REQUEST_TIMEOUT
+    ) as response:
+        if response.status_code in (404, 405):
+            transcribed = fetch_transcription(audio_bytes, input_lang, output_lang)["transcribed_text"]
+            placeholder.write(transcribed)
+            return transcribed
+        raise_for_error(response, "Failed to process audio")
+
+        segments = []
+        for event in iter_events(response):
+            if event["type"] == "segment":
+                segments.append(event["text"])
+                placeholder.markdown(" ".join(segments) + " ▌")
+            elif event["type"] == "error":
+                raise APIError(event.get("error", "Failed to process audio"))
+
+    original_text = " ".join(segments).strip()
+    placeholder.write(original_text)
+    transcribed = original_text
+    if original_text and input_lang != output_lang:
+        transcribed = stream_translation(original_text, input_lang, output_lang, placeholder)
+    remember(key, {"transcribed_text": transcribed})
+    return transcribed
+
 def main():
     # Sidebar
     with st.sidebar:
@@ -93,27 +307,22 @@ def show_translation_mode():
     )
     
     if st.button("Translate", key="translate_button"):
-        with st.spinner("Translating..."):
-            if input_text.strip():
-                try:
-                    response = requests.post(
-                        f"{API_URL}/translate",
-                        json={
-                            "text": input_text,
-                            "source_language": source_lang,
-                            "target_language": target_lang
-                        }
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        st.subheader("Translated Text:")
-                        st.write(result["translated_text"])
-                    else:
-                        st.error(f"Error: {response.json().get('error', 'Unknown error occurred')}")
-                except Exception as e:
-                    st.error(f"An error occurred: {str(e)}")
-            else:
-                st.warning("Please enter text to translate.")
+        if input_text.strip():
+            try:
+                if STREAM_RESPONSES:
+                    st.subheader("Translated Text:")
+                    stream_translation(input_text, source_lang, target_lang, st.empty())
+                else:
+                    with st.spinner("Translating..."):
+                        result = fetch_translation(input_text, source_lang, target_lang)
+                    st.subheader("Translated Text:")
+                    st.write(result["translated_text"])
+            except APIError as e:
+                st.error(f"Error: {str(e)}")
+            except Exception as e:
+                st.error(f"An error occurred: {str(e)}")
+        else:
+            st.warning("Please enter text to translate.")
 
 def show_stt_mode():
     st.header("Speech-to-Text")
@@ -149,29 +358,22 @@ def show_stt_mode():
             audio_to_process = uploaded_file.read()
 
         if st.button("Process Audio", key="process_audio_button"):
-            with st.spinner("Processing audio..."):
-                try:
-                    # Send audio data to the backend
-                    files = {"audio_file": ("audio.wav", audio_to_process, "audio/wav")}
-                    response = requests.post(
-                        f"{API_URL}/stt",
-                        files=files,
-                        data={
-                            "input_language": input_lang,
-                            "output_language": output_lang
-                        }
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        if "transcribed_text" in result:
-                            st.subheader("Transcribed Text:")
-                            st.write(result["transcribed_text"])
-                        else:
-                            st.error("Error: 'transcribed_text' not found in the response.")
+            try:
+                if STREAM_RESPONSES:
+                    st.subheader("Transcribed Text:")
+                    stream_transcription(audio_to_process, input_lang, output_lang, st.empty())
+                else:
+                    with st.spinner("Processing audio..."):
+                        result = fetch_transcription(audio_to_process, input_lang, output_lang)
+                    if "transcribed_text" in result:
+                        st.subheader("Transcribed Text:")
+                        st.write(result["transcribed_text"])
                     else:
-                        st.error(f"Error: {response.json().get('error', 'Failed to process audio')}")
-                except Exception as e:
-                    st.error(f"An error occurred: {str(e)}")
+                        st.error("Error: 'transcribed_text' not found in the response.")
+            except APIError as e:
+                st.error(f"Error: {str(e)}")
+            except Exception as e:
+                st.error(f"An error occurred: {str(e)}")
 
 def show_tts_mode():
     st.header("Text-to-Speech")
@@ -182,6 +384,13 @@ def show_tts_mode():
         key="tts_input"
     )
     
+    source_lang = st.selectbox(
+        "Text Language",
+        options=["auto"] + list(LANGUAGES.keys()),
+        format_func=lambda x: "Detect automatically" if x == "auto" else LANGUAGES[x],
+        key="tts_source"
+    )
+
     target_lang = st.selectbox(
         "Select Language",
         options=list(LANGUAGES.keys()),
@@ -196,31 +405,22 @@ def show_tts_mode():
             
         with st.spinner("Generating audio..."):
             try:
-                response = requests.post(
-                    f"{API_URL}/tts",
-                    json={
-                        "text": input_text,
-                        "target_language": target_lang
-                    }
-                )
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    # Display the transcribed text
-                    if "transcribed_text" in result:
-                        st.subheader("Transcribed Text:")
-                        st.write(result["transcribed_text"])
-                    else:
-                        st.warning("Transcribed text not found in the response.")
-                    
-                    # Play the generated audio
-                    if "audio_file" in result:
-                        audio_bytes = base64.b64decode(result["audio_file"])
-                        st.audio(audio_bytes, format="audio/wav")
-                    else:
-                        st.error("Audio file not found in the response.")
+                speech = fetch_speech(input_text, target_lang, source_lang)
+                # Display the transcribed text
+                transcript = speech["transcript"]
+                if transcript is not None:
+                    st.subheader("Transcribed Text:")
+                    st.write(unquote(transcript))
+                else:
+                    st.warning("Transcribed text not found in the response.")
+
+                # Play the generated audio
+                if speech["content"]:
+                    st.audio(speech["content"], format=speech["content_type"])
                 else:
-                    st.error("Failed to generate speech")
+                    st.error("Audio file not found in the response.")
+            except APIError as e:
+                st.error(str(e))
             except Exception as e:
                 st.error(f"Error: {str(e)}")
 
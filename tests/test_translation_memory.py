@@ -0,0 +1,32 @@
+from backend.translation_memory import TranslationMemory, patch_numbers
+
+
+def test_patched_decimal_uses_target_decimal_comma():
+    patched = patch_numbers(
+        "Take 2 mg twice daily.", "Prendre 2 mg deux fois par jour.",
+        "Take 2.5 mg twice daily.", "en", "fr"
+    )
+    assert patched == "Prendre 2,5 mg deux fois par jour."
+
+
+def test_decimal_comma_source_is_read_by_value():
+    patched = patch_numbers(
+        "Nehmen Sie 2,5 mg.", "Take 2.5 mg.",
+        "Nehmen Sie 1.000 mg.", "de", "en"
+    )
+    assert patched == "Take 1000 mg."
+
+
+def test_ambiguous_number_is_not_patched():
+    assert patch_numbers("Take 2 mg.", "Prendre 2 mg.", "Take 1,5 mg.", "en", "fr") is None
+
+
+def test_lookup_serves_patched_dose_in_target_format():
+    memory = TranslationMemory()
+    memory.add("Inject 0.5 ml of insulin before meals.", "Injecter 0,5 ml d'insuline avant les repas.", "en", "fr")
+
+    match = memory.lookup("Inject 0.75 ml of insulin before meals.", "en", "fr")
+
+    assert match is not None
+    assert match["match"] == "patched"
+    assert match["translated_text"] == "Injecter 0,75 ml d'insuline avant les repas."